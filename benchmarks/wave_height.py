@@ -0,0 +1,72 @@
+"""Per-frame cost of wave height lookups, as a function of entity count.
+
+Compares evaluating the whole wave formula for every lookup (before),
+against sharing the part that only depends on wave time for all lookups
+in a frame (after).
+
+Run with:
+    python benchmarks/wave_height.py
+"""
+
+import random
+from math import sin, pi as PI
+from time import perf_counter
+from typing import Callable
+
+from termnautica import settings
+from termnautica.ocean import Water
+
+
+FRAMES: int = 200
+REPEATS: int = 5  # Best is kept, since other processes add noise
+LOOKUPS_PER_ENTITY: int = 2  # `FishAI.update` checks `is_submerged` twice
+ENTITY_COUNTS: tuple[int, ...] = (0, 10, 30, 100, 300, 1_000, 5_000)
+CHUNK_COUNT: int = 8  # Locations are spread over this many chunks
+
+
+class WaterBefore(Water):
+    @classmethod
+    def wave_height_at(cls, wave_origin_x: float) -> float:
+        phi = wave_origin_x / cls._WAVE_LENGTH
+        x = cls.wave_time_remaining / cls._WAVE_INTERVAL
+        return cls._WAVE_AMPLITUDE * sin(2 * PI * x + phi) + cls.REST_LEVEL
+
+
+def frame_before(locations: list[float]) -> None:
+    Water.wave_time_remaining -= 1
+    if Water.wave_time_remaining < 0:
+        Water.wave_time_remaining = Water._WAVE_DURATION
+    for x in locations:
+        for _ in range(LOOKUPS_PER_ENTITY):
+            WaterBefore.wave_height_at(x)
+
+
+def frame_after(locations: list[float]) -> None:
+    Water.advance_wave_time()
+    for x in locations:
+        for _ in range(LOOKUPS_PER_ENTITY):
+            Water.wave_height_at(x)
+
+
+def measure(frame: Callable[[list[float]], None], locations: list[float]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = perf_counter()
+        for _ in range(FRAMES):
+            frame(locations)
+        best = min(best, perf_counter() - start)
+    return best / FRAMES * 1000  # Milliseconds
+
+
+def main() -> None:
+    half_width = CHUNK_COUNT * settings.CHUNK_WIDTH / 2
+    print(f"{'entities':>10} {'before (ms)':>12} {'after (ms)':>12}")
+    for count in ENTITY_COUNTS:
+        locations = [random.uniform(-half_width, half_width) for _ in range(count)]
+        before = measure(frame_before, locations)
+        after = measure(frame_after, locations)
+        print(f"{count:>10} {before:>12.4f} {after:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
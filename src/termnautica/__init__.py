@@ -1,3 +1,4 @@
+import argparse
 import os
 
 
@@ -11,6 +12,7 @@ from charz import Engine, Clock, Camera, Label, AssetLoader, Vec2  # noqa: E402
 pygame.mixer.init()
 
 from . import settings  # noqa: E402
+from .palette import ColorDepth  # noqa: E402
 from .split_screen import FastSplitScreen  # noqa: E402
 
 AssetLoader.animation_root = settings.ANIMATION_FOLDER
@@ -59,6 +61,9 @@ class App(Engine):
         second_camera=second_camera,
         delimiter=" ",
         delimiter_color=colex.REVERSE + colex.WHITE,
+        diff_output=settings.DIFF_OUTPUT,
+        color_depth=ColorDepth(settings.COLOR_DEPTH),
+        threaded_output=settings.THREADED_OUTPUT,
     )
 
     def __init__(self) -> None:
@@ -167,6 +172,16 @@ class App(Engine):
 
 
 def main() -> int | None:
+    parser = argparse.ArgumentParser(prog="termnautica")
+    parser.add_argument(
+        "--color-depth",
+        type=ColorDepth,
+        choices=list(ColorDepth),
+        default=ColorDepth(settings.COLOR_DEPTH),
+        help="colors to write, lower is faster over slow connections",
+    )
+    args = parser.parse_args()
+    App.screen.color_depth = args.color_depth
     app = App()
     app.run()
     pygame.quit()
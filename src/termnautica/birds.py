@@ -4,6 +4,8 @@ import colex
 from charz import AnimatedSprite, AnimationSet, Animation, Vec2, text
 
 from .props import Interactable, Collectable
+from .flyweight import Flyweight
+from .lod import LevelOfDetail
 from . import ocean
 
 
@@ -12,24 +14,24 @@ text._horizontal_conversions["»"] = "«"
 text._horizontal_conversions["«"] = "»"
 
 
-class BirdAI:
+class BirdAI(LevelOfDetail):
     _SPEED_SCALE: float = 0.3
 
-    def update(self) -> None:
+    def lod_update(self, frames: int) -> None:
         assert isinstance(self, AnimatedSprite)
 
         velocity = Vec2(
             random.randint(-1, 1),
             random.randint(-1, 1),
         )
-        self.position += velocity * self._SPEED_SCALE
+        self.position += velocity * self._SPEED_SCALE * frames
         while self.global_position.y > ocean.Water.wave_height_at(
             self.global_position.x
         ):
             self.global_position += Vec2.UP
 
         if random.randint(1, 100) < 30:
-            self.texture = text.flip_lines_h(self.texture)
+            self.texture = Flyweight.flipped_h(self.texture)
 
 
 class BaseBird(BirdAI, Interactable, Collectable, AnimatedSprite):
@@ -1,23 +1,25 @@
 import colex
-from charz import Sprite, ColliderComponent, Hitbox, Vec2, load_texture
+from charz import Sprite, Hitbox, Vec2, load_texture
 
+from ..collision import Collider, Colliders
 from ..player import Player
 from ..props import Interactable
 
 
-class Airlock(Interactable, ColliderComponent, Sprite):
+class Airlock(Interactable, Collider, Sprite):
     hitbox = Hitbox(size=Vec2(1, 3))
     color = colex.LIGHT_GRAY
     texture = load_texture("airlock/closed.txt")
+    CULL_MOVES = False
 
     def on_interact(self, interactor: Sprite) -> None:
         assert isinstance(
             interactor,
             Player,
         ), "Only `Player` can interact with `Airlock`"
-        self.hitbox.disabled = not self.hitbox.disabled
+        Colliders.set_disabled(self, not self.hitbox.disabled)
         # TEMP FIX:
-        interactor.hitbox.disabled = self.hitbox.disabled
+        Colliders.set_disabled(interactor, self.hitbox.disabled)
 
         if self.hitbox.disabled:
             self.texture = load_texture("airlock/open.txt")
@@ -1,9 +1,11 @@
 import random
+from typing import Any, Self
 
 import colex
 from charz import Sprite, Vec2
 
-from ..particles import Fire
+from ..particles import ParticleSystem, FIRE
+from ..scheduler import Scheduler
 from ..props import Interactable
 from ..fabrication import Fabrication
 from ..item import ItemID, Recipe
@@ -40,11 +42,14 @@ class Grill(Fabrication, Interactable, Sprite):
         "~~~",
         "\\ /",
     ]
-    _time_since_emmit: int = 0
 
-    def update(self) -> None:
-        self._time_since_emmit -= 1
-        if self._time_since_emmit <= 0:
-            self._time_since_emmit = self._FIRE_EMMIT_INTERVAL
-            fire = Fire().with_global_position(self.global_position + self._FIRE_OFFSET)
-            fire.position.x += random.randint(-1, 1)
+    # Schedule in `__new__`, so `Sprite.__init__` arguments are kept
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        Scheduler.call_in(0, instance._emmit_fire, owner=instance)
+        return instance
+
+    def _emmit_fire(self) -> None:
+        offset = self._FIRE_OFFSET + Vec2(random.randint(-1, 1), 0)
+        ParticleSystem.emit(FIRE, self.global_position + offset)
+        Scheduler.call_in(self._FIRE_EMMIT_INTERVAL, self._emmit_fire, owner=self)
@@ -1,10 +1,11 @@
 import colex
-from charz import Sprite, ColliderComponent, Hitbox, Node2D, Vec2, load_texture
+from charz import Sprite, Hitbox, Node2D, Vec2, load_texture
 
+from ..collision import Collider
 from .airlock import Airlock
 
 
-class HallwayRoof(ColliderComponent, Node2D):
+class HallwayRoof(Collider, Node2D):
     hitbox = Hitbox(size=Vec2(29, 1))
 
 
@@ -12,6 +13,7 @@ class Hallway(Sprite):
     transparency = " "
     color = colex.WHITE
     texture = load_texture("modules/hallway.txt")
+    CULL_MOVES = False
 
     def __init__(self) -> None:
         HallwayRoof(self, position=Vec2(0, 2))
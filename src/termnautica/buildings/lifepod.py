@@ -1,6 +1,7 @@
 import colex
-from charz import Sprite, Label, Hitbox, Vec2, load_texture
+from charz import Node, Sprite, Label, Hitbox, Vec2, load_texture
 
+from ..lifecycle import Lifecycle
 from ..player import Player
 from ..props import Interactable, Building
 from .smelter import Smelter
@@ -87,7 +88,8 @@ class Lifepod(Interactable, Building, Sprite):
             Player,
         ), "Only `Player` can interact with `Lifepod`"
         # Reparent, then move to entry location
-        interactor.parent = self
+        Lifecycle.reparent(interactor, self)
+        Lifecycle.on_reparented(interactor, self._on_interactor_reparented)
         interactor.global_position = self.global_position + self.entry_location
         # Change state and texture
         self.interactable = False
@@ -111,11 +113,16 @@ class Lifepod(Interactable, Building, Sprite):
             f"{self._curr_interactor}.parent "
             f"({self._curr_interactor.parent}) is missing `Sprite` base"
         )
-        # Unset parent of player
-        self._curr_interactor.parent = None
-        self._curr_interactor.global_position = (
-            self.global_position + self.exit_location
-        )
+        interactor = self._curr_interactor
+        # Unset parent of player - Resets state through `_on_interactor_reparented`
+        Lifecycle.reparent(interactor, None)
+        interactor.global_position = self.global_position + self.exit_location
+
+    def _on_interactor_reparented(self, interactor: Node, parent: Node | None) -> None:
+        # Also happens when player leaves without the ladder, like when dying
+        if interactor is not self._curr_interactor or parent is self:
+            return
+        Lifecycle.off_reparented(interactor, self._on_interactor_reparented)
         # Unset player
         self._curr_interactor = None
         self.interactable = True
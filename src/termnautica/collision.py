@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, ClassVar, Self
+
+from charz import Scene, Group, Node, ColliderComponent
+from charz_core.typing import NodeID
+
+from .lifecycle import Lifecycle
+
+
+type Rect = tuple[float, float, float, float]  # Left, top, right, bottom
+
+
+def hitbox_rect(node: ColliderComponent) -> Rect:
+    """Get global rectangle of hitbox, ignoring rotation.
+
+    Args:
+        node (ColliderComponent): node with hitbox
+
+    Returns:
+        Rect: left, top, right and bottom, in global space
+    """
+    location = node.global_position  # type: ignore
+    size = node.hitbox.size
+    left = location.x - size.x / 2 if node.hitbox.centered else location.x
+    top = location.y - size.y / 2 if node.hitbox.centered else location.y
+    return (left, top, left + size.x, top + size.y)
+
+
+class Collider(ColliderComponent):
+    """`ColliderComponent` tracked by the broadphase of `Colliders`.
+
+    Added on the frame after creation, and removed when freed.
+    Colliders that don't move each frame have to report with `Colliders.moved`.
+    """
+
+    COLLIDER_MOVES: ClassVar[bool] = False  # Refresh each frame
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        Colliders._pending.append(instance)
+        return instance
+
+
+class Colliders:
+    """Sweep and prune broadphase over enabled `Collider` hitboxes.
+
+    Hitboxes are kept sorted by left edge. A query only visits hitboxes
+    with a left edge between its own left edge minus the widest hitbox,
+    and its own right edge. The order is only touched when a collider
+    moves, or is enabled or disabled.
+    """
+
+    # Largest distance a moving collider travels per axis in a frame,
+    # since others may have moved after their box was refreshed (`Player._MAX_SPEED`)
+    MOVER_SLACK: ClassVar[float] = 2
+    _pending: ClassVar[list[Collider]] = []
+    _movers: ClassVar[dict[NodeID, Collider]] = {}
+    _lefts: ClassVar[list[tuple[float, NodeID]]] = []  # Sorted
+    _boxes: ClassVar[dict[NodeID, tuple[Rect, Collider]]] = {}
+    _widest: ClassVar[float] = 0
+
+    @classmethod
+    def _insert(cls, node: Collider) -> None:
+        if node.hitbox.disabled:
+            return
+        rect = hitbox_rect(node)
+        cls._boxes[node.uid] = (rect, node)
+        insort(cls._lefts, (rect[0], node.uid))
+        cls._widest = max(cls._widest, rect[2] - rect[0])
+
+    @classmethod
+    def _remove(cls, node: Node) -> None:
+        entry = cls._boxes.pop(node.uid, None)
+        if entry is not None:
+            cls._lefts.remove((entry[0][0], node.uid))
+
+    @classmethod
+    def _untrack(cls, node: Node) -> None:
+        cls._remove(node)
+        cls._movers.pop(node.uid, None)
+
+    @classmethod
+    def moved(cls, node: Collider) -> None:
+        """Refresh hitbox of collider in the broadphase, after being moved."""
+        entry = cls._boxes.get(node.uid)
+        if entry is not None and entry[0] == hitbox_rect(node):
+            return
+        cls._remove(node)
+        cls._insert(node)
+
+    @classmethod
+    def set_disabled(cls, node: Collider, state: bool) -> None:
+        """Disable or enable hitbox of collider, and update the broadphase.
+
+        Args:
+            node (Collider): collider to toggle
+            state (bool): `True` to disable
+        """
+        node.hitbox.disabled = state
+        cls._remove(node)
+        cls._insert(node)
+
+    @classmethod
+    def query_rect(cls, rect: Rect) -> list[Collider]:
+        """Find enabled colliders with a hitbox overlapping rectangle.
+
+        Args:
+            rect (Rect): global rectangle
+
+        Returns:
+            list[Collider]: overlapping colliders, sorted by left edge
+        """
+        left, top, right, bottom = rect
+        start = bisect_left(cls._lefts, (left - cls._widest,))
+        stop = bisect_right(cls._lefts, (right, float("inf")))
+        found: list[Collider] = []
+        for _left, uid in cls._lefts[start:stop]:
+            (_other_left, other_top, other_right, other_bottom), node = cls._boxes[uid]
+            if other_right >= left and other_top <= bottom and other_bottom >= top:
+                found.append(node)
+        return found
+
+    @classmethod
+    def is_colliding(cls, node: Collider) -> bool:
+        """Check if collider collides with any other, like `is_colliding`.
+
+        Args:
+            node (Collider): collider at its current location
+
+        Returns:
+            bool: whether colliding with any other enabled collider
+        """
+        if node.hitbox.disabled:
+            return False
+        if node.uid in cls._movers:
+            cls.moved(node)
+        left, top, right, bottom = hitbox_rect(node)
+        slack = cls.MOVER_SLACK
+        for other in cls.query_rect(
+            (left - slack, top - slack, right + slack, bottom + slack)
+        ):
+            if other is not node and node.is_colliding_with(other):  # type: ignore
+                return True
+        return False
+
+
+def update_colliders(current_scene: Scene) -> None:
+    """Add new colliders to the broadphase, and refresh those that move."""
+    if Colliders._pending:
+        nodes = current_scene.groups[Group.NODE]
+        for node in Colliders._pending:
+            if node.uid not in nodes:  # Freed before it was added
+                continue
+            Colliders._insert(node)
+            Lifecycle.on_freed(node, Colliders._untrack)
+            if node.COLLIDER_MOVES:
+                Colliders._movers[node.uid] = node
+        Colliders._pending.clear()
+    for node in Colliders._movers.values():
+        Colliders.moved(node)
+
+
+# Run before `update_nodes` (90)
+Scene.frame_tasks[93] = update_colliders
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from math import hypot
+from typing import ClassVar
+
+from charz import Scene, Group, Vec2, Vec2i
+from charz.typing import TextureNode
+from charz_core.typing import NodeID
+
+from . import settings
+from .scheduler import Scheduler
+from .spatial import SpatialGrid
+
+
+type Rect = tuple[float, float, float, float]  # Left, top, right, bottom
+
+
+def texture_rect(node: TextureNode) -> Rect:
+    """Get global rectangle covered by texture, grown to fit any rotation.
+
+    Args:
+        node (TextureNode): node to get rectangle of
+
+    Returns:
+        Rect: left, top, right and bottom, in global space
+    """
+    location = node.global_position
+    size = node.get_texture_size()
+    if node.global_rotation:
+        reach = hypot(size.x, size.y)
+        return (
+            location.x - reach,
+            location.y - reach,
+            location.x + reach,
+            location.y + reach,
+        )
+    left = location.x - size.x / 2 if node.centered else location.x
+    top = location.y - size.y / 2 if node.centered else location.y
+    return (left, top, left + size.x, top + size.y)
+
+
+class ViewCulling:
+    """Index over texture nodes, used to pick only the nodes a camera may see.
+
+    New and freed nodes are picked up once per frame. Nodes are refreshed
+    each frame, except for those with class attribute `CULL_MOVES = False`,
+    that have to be reported with `moved` by whatever moves them.
+    Nodes in group `"clip-to-view"` and their children are rebuilt for each view,
+    so they are always included.
+    """
+
+    _grid: ClassVar[SpatialGrid] = SpatialGrid(settings.SPATIAL_CELL_SIZE)
+    _nodes: ClassVar[dict[NodeID, TextureNode]] = {}
+    _rects: ClassVar[dict[NodeID, Rect]] = {}
+    _movers: ClassVar[dict[NodeID, TextureNode]] = {}
+    _large: ClassVar[dict[NodeID, TextureNode]] = {}  # Larger than a grid cell
+    _always: ClassVar[dict[NodeID, TextureNode]] = {}
+    _dirty: ClassVar[dict[NodeID, TextureNode]] = {}
+    _order: ClassVar[dict[NodeID, int]] = {}  # Order of joining `Group.TEXTURE`
+    _next_order: ClassVar[int] = 0
+    _synced_frame: ClassVar[int] = -1
+
+    @classmethod
+    def moved(cls, node: TextureNode) -> None:
+        """Refresh rectangle of node before next cull, after being moved or resized."""
+        if node.uid in cls._nodes:
+            cls._dirty[node.uid] = node
+
+    @classmethod
+    def _add(cls, node: TextureNode) -> None:
+        cls._nodes[node.uid] = node
+        clipped = Scene.current.groups["clip-to-view"]
+        if node.uid in clipped or (
+            node.parent is not None and node.parent.uid in clipped
+        ):
+            cls._always[node.uid] = node
+            return
+        if getattr(node, "CULL_MOVES", True):
+            cls._movers[node.uid] = node
+        cls._refresh(node)
+
+    @classmethod
+    def _remove(cls, uid: NodeID) -> None:
+        node = cls._nodes.pop(uid)
+        cls._rects.pop(uid, None)
+        cls._movers.pop(uid, None)
+        cls._always.pop(uid, None)
+        cls._large.pop(uid, None)
+        cls._dirty.pop(uid, None)
+        del cls._order[uid]
+        cls._grid.remove(node)
+
+    @classmethod
+    def _refresh(cls, node: TextureNode) -> None:
+        rect = texture_rect(node)
+        cls._rects[node.uid] = rect
+        size = cls._grid.cell_size
+        if rect[2] - rect[0] > size or rect[3] - rect[1] > size:
+            cls._grid.remove(node)
+            cls._large[node.uid] = node
+        else:
+            cls._large.pop(node.uid, None)
+            cls._grid.move(node, rect[0], rect[1])
+
+    @classmethod
+    def _sync(cls) -> None:
+        frame = Scheduler.frame()
+        if frame != cls._synced_frame:
+            cls._synced_frame = frame
+            members = Scene.current.groups[Group.TEXTURE]
+            # Set operations on keys, so unchanged nodes are not visited in Python
+            for uid in cls._nodes.keys() - members.keys():
+                cls._remove(uid)
+            added = members.keys() - cls._nodes.keys()
+            if added:
+                # New members are at the end of the group, in the order
+                # they are drawn in when `z_index` is equal
+                new_uids: list[NodeID] = []
+                for uid in reversed(members):
+                    if uid in added:
+                        new_uids.append(uid)
+                        if len(new_uids) == len(added):
+                            break
+                for uid in reversed(new_uids):
+                    cls._order[uid] = cls._next_order
+                    cls._next_order += 1
+                    cls._add(members[uid])  # type: ignore
+            for node in cls._movers.values():
+                cls._refresh(node)
+        for node in cls._dirty.values():
+            cls._refresh(node)
+        cls._dirty.clear()
+
+    @classmethod
+    def cull(cls, start: Vec2, size: Vec2i) -> list[TextureNode]:
+        """Pick nodes that overlap viewport, sorted by `z_index`.
+
+        Args:
+            start (Vec2): global location of top left corner of viewport
+            size (Vec2i): size of viewport
+
+        Returns:
+            list[TextureNode]: nodes that may be visible, in the same order
+                as they would be drawn from `Group.TEXTURE`
+        """
+        cls._sync()
+        # Include 1 extra cell, in case view is not aligned to the grid
+        left = start.x - 1
+        top = start.y - 1
+        right = start.x + size.x + 1
+        bottom = start.y + size.y + 1
+        rects = cls._rects
+        cell_size = cls._grid.cell_size
+        # Grid is keyed by top left corner, that may be up to 1 cell outside
+        candidates = cls._grid.query_aabb(
+            left - cell_size,
+            top - cell_size,
+            right,
+            bottom,
+        )
+        visible: list[TextureNode] = list(cls._always.values())
+        for node in (*candidates, *cls._large.values()):
+            rect_left, rect_top, rect_right, rect_bottom = rects[node.uid]
+            if (
+                rect_right >= left
+                and rect_left <= right
+                and rect_bottom >= top
+                and rect_top <= bottom
+            ):
+                visible.append(node)  # type: ignore
+        order = cls._order
+        visible.sort(key=lambda node: (node.z_index, order[node.uid]))
+        return visible
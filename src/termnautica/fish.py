@@ -1,17 +1,41 @@
+from __future__ import annotations
+
 import random
 from enum import ReprEnum, Enum, auto
-from typing import TYPE_CHECKING, assert_never
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, ClassVar, Self, assert_never
 
 import pygame
 import colex
 from colex import ColorValue
-from charz import Sprite, Scene, Group, Vec2, text, clamp, sign
+from charz import (
+    Sprite,
+    Node,
+    Node2D,
+    Scene,
+    Group,
+    Vec2,
+    Vec2i,
+    group,
+    text,
+    clamp,
+    sign,
+)
+from charz_core.typing import NodeID
 
 from . import settings
 from .props import Collectable, Interactable, Targetable, HasHealth
 from .player import Player
 from .item import ItemID
-from .particles import Blood
+from .culling import ViewCulling
+from .flyweight import Flyweight
+from .lifecycle import Lifecycle
+from .lod import LOD, LevelOfDetail, LODTier
+from .particles import ParticleSystem, BLOOD
+from .pathfinding import FlowFields
+from .pool import Pooled
+from .scheduler import Scheduler
+from .spatial import SpatialIndex
 from .utils import move_toward
 
 # Type checking for lazy loading
@@ -50,7 +74,7 @@ class Direction(Enum):
     NONE = auto()
 
 
-class FishAI:
+class FishAI(Pooled, LevelOfDetail):
     _SPEED_SCALE: float = 0.1
     _ACCELERATION: Vec2 = Vec2(0.2, 1.1)
     _FRICTION: Vec2 = Vec2(0.15, 0.50)
@@ -60,44 +84,62 @@ class FishAI:
     speed_y: float = 0
     _state: FishState = FishState.IDLE
     _direction: Direction = Direction.LEFT  # Sprites are drawn facing left
-    _action_time_remaining: int = 0
     assert _ACCELERATION > _FRICTION, "Invalid constants"
 
-    def update(self) -> None:
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        Scheduler.call_in(0, instance._change_action, owner=instance)
+        return instance
+
+    def reset(self) -> None:
         assert isinstance(self, Sprite), f"`Sprite` base missing for {self}"
+        self.speed_x = 0
+        self.speed_y = 0
+        self._state = FishState.IDLE
+        self._direction = Direction.LEFT
+        self.texture = self.__class__.texture
+        Scheduler.call_in(0, self._change_action, owner=self)
+
+    def _change_action(self) -> None:
+        assert isinstance(self, Sprite), f"`Sprite` base missing for {self}"
+        if not self.is_submerged():  # Only activate AI when in water
+            Scheduler.call_in(1, self._change_action, owner=self)
+            return
+        states = tuple(FishState)
+        self._state = (min_time, max_time) = random.choice(states)
+        Scheduler.call_in(
+            random.randint(min_time, max_time),
+            self._change_action,
+            owner=self,
+        )
+        self._direction = Direction.NONE
+        # Random change of Y-level
+        self.position.y += random.randint(-1, 1)
 
-        if self.is_submerged():  # Activate AI when in water
-            self._action_time_remaining -= 1
-            if self._action_time_remaining <= 0:
-                states = tuple(FishState)
-                self._state = (min_time, max_time) = random.choice(states)
-                self._action_time_remaining = random.randint(min_time, max_time)
-                self._direction = Direction.NONE
-                # Random change of Y-level
-                self.position.y += random.randint(-1, 1)
+    def lod_update(self, frames: int) -> None:
+        assert isinstance(self, Sprite), f"`Sprite` base missing for {self}"
 
         match self._state:
             case FishState.IDLE:
-                self.speed_x = move_toward(self.speed_x, 0, self._FRICTION.x)
-                self.position.x += self.speed_x * self._SPEED_SCALE
+                self.speed_x = move_toward(self.speed_x, 0, self._FRICTION.x * frames)
+                self.position.x += self.speed_x * self._SPEED_SCALE * frames
             case FishState.WANDRING:
-                self.move()
+                self.move(frames=frames)
             case FishState.FLEEING:
-                self.move(quick=True)
+                self.move(quick=True, frames=frames)
             case FishState.FLOATING:
-                self.position.x += self.speed_x * self._SPEED_SCALE
+                self.position.x += self.speed_x * self._SPEED_SCALE * frames
             case _:
                 assert_never(self._state)
 
         # Fall if above ocean top - Gravity
         if self.is_submerged():
-            self.speed_y = move_toward(self.speed_y, 0, self._FRICTION.y)
-            while ocean.Floor.has_loose_point_inside(self.global_position):
-                self.position += Vec2.UP
+            self.speed_y = move_toward(self.speed_y, 0, self._FRICTION.y * frames)
+            self.position.y -= ocean.Floor.depth_inside(self.global_position)
         else:
-            self.speed_y += self._ACCELERATION.y
+            self.speed_y += self._ACCELERATION.y * frames
             self.speed_y = clamp(self.speed_y, -self._MAX_SPEED.y, self._MAX_SPEED.y)
-        self.position.y += self.speed_y * self._SPEED_SCALE
+        self.position.y += self.speed_y * self._SPEED_SCALE * frames
 
     def is_submerged(self) -> bool:
         _ensure_ocean()  # Lazy load `OceanWater`
@@ -106,10 +148,10 @@ class FishAI:
         wave_height = ocean.Water.wave_height_at(self.global_position.x)
         return self_height - wave_height > 0
 
-    def move(self, quick: bool = False) -> None:
+    def move(self, quick: bool = False, frames: int = 1) -> None:
         assert isinstance(self, Sprite), f"`Sprite` base missing for {self}"
 
-        acceleration = (
+        acceleration = frames * (
             self._ACCELERATION.x
             if not quick
             else self._QUICK_FACTOR * self._ACCELERATION.x
@@ -121,7 +163,7 @@ class FishAI:
                 self.texture = self.__class__.texture
             else:
                 self._direction = Direction.RIGHT
-                self.texture = text.flip_lines_h(self.__class__.texture)
+                self.texture = Flyweight.flipped_h(self.__class__.texture)
 
         if self._direction is Direction.LEFT:
             self.speed_x -= acceleration
@@ -129,15 +171,286 @@ class FishAI:
             self.speed_x += acceleration
         self.speed_x = clamp(self.speed_x, -self._MAX_SPEED.x, self._MAX_SPEED.x)
 
-        self.position.x += self.speed_x * 0.1
+        self.position.x += self.speed_x * self._SPEED_SCALE * frames
         if not quick:  # Friction when moving normal
-            self.speed_x = move_toward(self.speed_x, 0, self._FRICTION.x)
+            self.speed_x = move_toward(self.speed_x, 0, self._FRICTION.x * frames)
+
+
+@group("clip-to-view")
+class FishSchool(Node):
+    """Batched `FishAI` for all `BaseFish`, with fish state stored as parallel lists.
+
+    The state machine, friction and gravity are advanced for all fish
+    in 1 step per frame, using the constants of `FishAI`.
+    Fish are skipped by level of detail, like nodes updated by `LOD`.
+    The school owns the location of its fish, and only writes it back
+    to the sprites that are about to be drawn, in `clip_to_view`.
+    Fish are moved in their spatial grids by the school, when updated.
+    """
+
+    _current: ClassVar[FishSchool | None] = None
+
+    def __init__(self) -> None:
+        self._pending: list[BaseFish] = []  # Joined, but not read from yet
+        self._slots: dict[NodeID, int] = {}
+        self._fish: list[BaseFish] = []
+        self._x: list[float] = []
+        self._y: list[float] = []
+        self._drawn_x: list[float] = []  # Location last written to sprite
+        self._drawn_y: list[float] = []
+        self._speed_x: list[float] = []
+        self._speed_y: list[float] = []
+        self._state: list[FishState] = []
+        self._direction: list[Direction] = []
+        self._next_action: list[int] = []  # Frame to change action at
+        self._half_height: list[float] = []
+        self._extent: list[float] = []  # Reach of texture from location, for culling
+        self._tier: list[LODTier] = []
+        self._updated_at: list[int] = []  # Frame
+        self._columns: tuple[list[Any], ...] = (
+            self._fish,
+            self._x,
+            self._y,
+            self._drawn_x,
+            self._drawn_y,
+            self._speed_x,
+            self._speed_y,
+            self._state,
+            self._direction,
+            self._next_action,
+            self._half_height,
+            self._extent,
+            self._tier,
+            self._updated_at,
+        )
+
+    @classmethod
+    def join(cls, fish: BaseFish) -> None:
+        """Simulate fish in the school, starting from its location on next step.
+
+        Args:
+            fish (BaseFish): new or recycled fish
+        """
+        school = cls._current
+        if school is None or school.uid not in Scene.current.groups[Group.NODE]:
+            school = cls._current = cls()
+        school._pending.append(fish)
+
+    def __len__(self) -> int:
+        return len(self._fish)
+
+    @classmethod
+    def location_of(cls, node: Node2D) -> Vec2:
+        """Get current location of node, which for fish is owned by the school.
+
+        Sprites of fish are only moved when drawn, so use this instead of
+        `global_position` for nodes that may be fish.
+
+        Args:
+            node (Node2D): fish, or any other node
+
+        Returns:
+            Vec2: global location
+        """
+        school = cls._current
+        if school is not None:
+            index = school._slots.get(node.uid)
+            if index is not None:
+                return Vec2(school._x[index], school._y[index])
+        return node.global_position
+
+    def _add_pending(self) -> None:
+        nodes = Scene.current.groups[Group.NODE]
+        frame = Scheduler.frame()
+        for fish in self._pending:
+            if fish.uid not in nodes or fish.uid in self._slots:
+                continue
+            location = fish.global_position
+            size = fish.get_texture_size()
+            self._slots[fish.uid] = len(self._fish)
+            self._fish.append(fish)
+            self._x.append(location.x)
+            self._y.append(location.y)
+            self._drawn_x.append(location.x)
+            self._drawn_y.append(location.y)
+            self._speed_x.append(0)
+            self._speed_y.append(0)
+            self._state.append(FishState.IDLE)
+            self._direction.append(Direction.LEFT)
+            self._next_action.append(frame)
+            self._half_height.append(size.y / 2)
+            self._extent.append(max(size.x, size.y) / 2 + 1)
+            self._tier.append(LODTier.VIEW)
+            self._updated_at.append(frame - 1)
+            Lifecycle.on_freed(fish, self._remove)
+        self._pending.clear()
+
+    def _remove(self, fish: Node) -> None:
+        # Swap with last, to remove in constant time
+        index = self._slots.pop(fish.uid)
+        last = len(self._fish) - 1
+        for column in self._columns:
+            column[index] = column[last]
+            column.pop()
+        if index != last:
+            self._slots[self._fish[index].uid] = index
 
+    def update(self) -> None:
+        _ensure_ocean()  # Lazy load `Water` and `Floor`
+        if self._pending:
+            self._add_pending()
+        # Hoist lookups out of the loop
+        wave_height_at = ocean.Water.wave_height_at
+        depth_at = ocean.Floor.depth_at
+        frame = Scheduler.frame()
+        states = tuple(FishState)
+        tier_at = LOD.tier_at
+        pick_tiers = frame % settings.LOD_CHECK_INTERVAL == 0
+        nearby_interval = settings.LOD_NEARBY_INTERVAL
+        due_slot = LOD.due_slot(frame)
+        speed_scale = FishAI._SPEED_SCALE
+        acceleration_x = FishAI._ACCELERATION.x
+        acceleration_y = FishAI._ACCELERATION.y
+        friction_x = FishAI._FRICTION.x
+        friction_y = FishAI._FRICTION.y
+        max_speed_x = FishAI._MAX_SPEED.x
+        max_speed_y = FishAI._MAX_SPEED.y
+        quick_factor = FishAI._QUICK_FACTOR
+        xs = self._x
+        ys = self._y
+        speeds_x = self._speed_x
+        speeds_y = self._speed_y
+        fish_states = self._state
+        directions = self._direction
+        next_actions = self._next_action
+        half_heights = self._half_height
+        tiers = self._tier
+        updated_ats = self._updated_at
+        move_in_grids = SpatialIndex.move
+
+        for index, fish in enumerate(self._fish):
+            x = xs[index]
+            y = ys[index]
+            # Level of detail, where distant fish only have their action timer run
+            if pick_tiers:
+                tier = tiers[index] = tier_at(x, y)
+            else:
+                tier = tiers[index]
+            if tier is LODTier.DISTANT or (
+                tier is LODTier.NEARBY and index % nearby_interval != due_slot
+            ):
+                continue
+            frames = clamp(frame - updated_ats[index], 1, nearby_interval)
+            updated_ats[index] = frame
+            half_height = half_heights[index]
+            state = fish_states[index]
+            direction = directions[index]
+            # Change action, only when in water
+            if next_actions[index] <= frame:
+                if y - half_height - wave_height_at(x) > 0:
+                    state = random.choice(states)
+                    (min_time, max_time) = state
+                    next_actions[index] = frame + random.randint(min_time, max_time)
+                    direction = Direction.NONE
+                    y += random.randint(-1, 1)  # Random change of Y-level
+                else:
+                    next_actions[index] = frame + 1
+            # Move along X-axis
+            speed_x = speeds_x[index]
+            if state is FishState.IDLE:
+                speed_x = move_toward(speed_x, 0, friction_x * frames)
+                x += speed_x * speed_scale * frames
+            elif state is FishState.FLOATING:
+                x += speed_x * speed_scale * frames
+            else:
+                quick = state is FishState.FLEEING
+                acceleration = frames * (
+                    quick_factor * acceleration_x if quick else acceleration_x
+                )
+                if direction is Direction.NONE:
+                    if random.randint(0, 1):
+                        direction = Direction.LEFT
+                        fish.texture = fish.__class__.texture
+                    else:
+                        direction = Direction.RIGHT
+                        fish.texture = Flyweight.flipped_h(fish.__class__.texture)
+                if direction is Direction.LEFT:
+                    speed_x -= acceleration
+                elif direction is Direction.RIGHT:
+                    speed_x += acceleration
+                speed_x = clamp(speed_x, -max_speed_x, max_speed_x)
+                x += speed_x * speed_scale * frames
+                if not quick:  # Friction when moving normal
+                    speed_x = move_toward(speed_x, 0, friction_x * frames)
+            # Fall if above ocean top - Gravity
+            speed_y = speeds_y[index]
+            if y - half_height - wave_height_at(x) > 0:
+                speed_y = move_toward(speed_y, 0, friction_y * frames)
+                y -= depth_at(x, y)
+            else:
+                speed_y = clamp(
+                    speed_y + acceleration_y * frames, -max_speed_y, max_speed_y
+                )
+            y += speed_y * speed_scale * frames
+
+            xs[index] = x
+            ys[index] = y
+            speeds_x[index] = speed_x
+            speeds_y[index] = speed_y
+            fish_states[index] = state
+            directions[index] = direction
+            move_in_grids(fish, x, y)
+
+    def clip_to_view(self, start: Vec2, size: Vec2i) -> None:
+        # Sync fish in view, and fish whose sprite is still drawn in view
+        left = start.x
+        top = start.y
+        right = left + size.x
+        bottom = top + size.y
+        drawn_xs = self._drawn_x
+        drawn_ys = self._drawn_y
+        for index, (fish, x, y, extent) in enumerate(
+            zip(self._fish, self._x, self._y, self._extent)
+        ):
+            drawn_x = drawn_xs[index]
+            drawn_y = drawn_ys[index]
+            if x == drawn_x and y == drawn_y:
+                continue
+            if (
+                left - extent <= x <= right + extent
+                and top - extent <= y <= bottom + extent
+            ) or (
+                left - extent <= drawn_x <= right + extent
+                and top - extent <= drawn_y <= bottom + extent
+            ):
+                fish.global_position = Vec2(x, y)
+                ViewCulling.moved(fish)
+                drawn_xs[index] = x
+                drawn_ys[index] = y
+
+
+class BaseFish(Pooled, Interactable, Collectable, Sprite):
+    """Fish moved by `FishSchool`, in batch with all other fish.
+
+    Location is owned by the school, and written back only when in view.
+    """
 
-class BaseFish(FishAI, Interactable, Collectable, Sprite):
     _SOUND_COLLECT = pygame.mixer.Sound(settings.SOUNDS_FOLDER / "collect" / "fish.wav")
+    SPATIAL_MOVES = False  # Moved by `FishSchool`
+    CULL_MOVES = False
     centered = True
 
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        FishSchool.join(instance)
+        return instance
+
+    def reset(self) -> None:
+        self.texture = self.__class__.texture
+        self.loose_focus()  # May have been freed while highlighted
+        FishSchool.join(self)
+        self.track_spatial()
+
 
 class SmallFish(BaseFish):
     _SOUND_COLLECT = pygame.mixer.Sound(
@@ -177,6 +490,8 @@ class Nemo(BaseFish):
 class SwordFish(FishAI, HasHealth, Interactable, Targetable, Sprite):
     _REACH = 6  # Shorter reach to attack it
     _REACH_CENTER = Vec2(6, 0)
+    _NOTICE_RANGE: float = 20  # Sneaks toward players closer than this
+    _ATTACK_RANGE: float = 4
     _DAMAGE: int = 15
     _ATTACK_INTERVAL: int = 10  # Frames
     _SOUND_HIT = pygame.mixer.Sound(settings.SOUNDS_FOLDER / "hit.wav")
@@ -193,7 +508,7 @@ class SwordFish(FishAI, HasHealth, Interactable, Targetable, Sprite):
     # texture = ["«««°(((()><"]
     texture = ["«««Ó((ΞΞΞΞx<"]
     _health: float = 5
-    _attack_cooldown: int = 0
+    _can_attack: bool = True
     _is_highlighted: bool = False
 
     @property
@@ -210,14 +525,14 @@ class SwordFish(FishAI, HasHealth, Interactable, Targetable, Sprite):
         assert isinstance(actor, Player), "Only `Player` can attack `SwordFish`"
         self._health -= actor.damage
         for _ in range(self._ATTACKED_BLOOD_COUNT):
-            blood = Blood().with_global_position(self.global_position)
-            blood.position.x += random.randint(-2, 2)
+            offset = Vec2(random.randint(-2, 2), 0)
+            ParticleSystem.emit(BLOOD, self.global_position + offset)
             self._SOUND_HIT.play()
         if self._health <= 0:
             self.queue_free()
             for _ in range(self._DEATH_BLOOD_COUNT):
-                blood = Blood().with_global_position(self.global_position)
-                blood.position.x += random.randint(-2, 2)
+                offset = Vec2(random.randint(-2, 2), 0)
+                ParticleSystem.emit(BLOOD, self.global_position + offset)
 
     def grab_focus(self) -> None:
         super().grab_focus()
@@ -227,44 +542,72 @@ class SwordFish(FishAI, HasHealth, Interactable, Targetable, Sprite):
         super().loose_focus()
         self._is_highlighted = False
 
-    def update(self) -> None:
+    def reset(self) -> None:
+        super().reset()
+        self._health = self.__class__._health
+        self._can_attack = True
+        self._is_highlighted = False
+        self.loose_focus()
+        self.loose_target()
+        self.track_spatial()
+
+    def _ready_attack(self) -> None:
+        self._can_attack = True
+
+    def lod_update(self, frames: int) -> None:
         # TODO: Add spatial sound
         if (
-            random.randint(1, self._SOUND_LURK_CHANCE) == 1
+            random.randint(1, self._SOUND_LURK_CHANCE) <= frames
             and not self._CHANNEL_LURK.get_busy()
         ):
             self._CHANNEL_LURK.play(self._SOUND_LURK)
         # TODO: Refactor this quick solution
-        super().update()  # Process `FishAI`
-        if not self.is_submerged():
+        super().lod_update(frames)  # Process `FishAI`
+        if not self.is_submerged() or not self._can_attack:
             return
-        self._attack_cooldown -= 1
-        if self._attack_cooldown >= 0:
-            return
-        for node in Scene.current.groups[Group.TEXTURE].values():
-            if isinstance(node, Player):
-                if node.is_in_building():
-                    self.color = self.__class__.color
-                    continue
-                # TODO: Properly center fish
-                dist = self.global_position.distance_to(node.global_position)
-                if dist < 20:
-                    direction = self.global_position.direction_to(node.global_position)
+        location = self.global_position
+        nearby_players = sorted(
+            (
+                (location.distance_squared_to(node.global_position), node)
+                for node in Scene.current.get_group_members("player", type_hint=Player)
+            ),
+            key=itemgetter(0),
+        )
+        self.color = self.__class__.color  # Unless sneaking
+        for _distance, node in nearby_players:
+            if node.is_in_building():
+                continue
+            # TODO: Properly center fish
+            dist = location.distance_to(node.global_position)
+            if dist < self._NOTICE_RANGE:
+                # Follow the field shared by all fish pursuing this player,
+                # which is `None` until built and where there is no path
+                field = FlowFields.field(node)
+                direction = (
+                    None
+                    if field is None
+                    else field.direction_at(location.x, location.y)
+                )
+                if direction is not None:
                     self.position += direction * 0.5
                     if sign(direction.x) == 1:
-                        self.texture = text.flip_lines_h(self.__class__.texture)
-                    else:
+                        self.texture = Flyweight.flipped_h(self.__class__.texture)
+                    elif sign(direction.x) == -1:
                         self.texture = self.__class__.texture
                     self.color = self._STEALTH_COLOR
-                if dist < 4:
-                    self._attack_cooldown = self._ATTACK_INTERVAL
-                    node.health -= self._DAMAGE
-                    self.color = self.__class__.color
-                if dist >= 20:
-                    self.color = self.__class__.color
-                break
+            if dist < self._ATTACK_RANGE:
+                self._can_attack = False
+                # Ready on the frame after the interval has passed
+                Scheduler.call_in(
+                    self._ATTACK_INTERVAL + 1,
+                    self._ready_attack,
+                    owner=self,
+                )
+                node.health -= self._DAMAGE
+                self.color = self.__class__.color
+            break
         # Respect highlight
         assert self.color is not None, "Color of `Swordfish` was None"
         # `colex.REVERSE` means highlighted
         if colex.REVERSE not in self.color and self._is_highlighted:
-            self.color = colex.REVERSE + self.color
+            self.color = Flyweight.highlighted(self.color)
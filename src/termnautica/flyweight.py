@@ -0,0 +1,76 @@
+from typing import ClassVar
+
+import colex
+from colex import ColorValue
+from charz import text
+
+
+type Texture = list[str]
+
+
+class Flyweight:
+    """Interned textures, flipped textures and highlight color strings.
+
+    Lookups return shared objects, so hot paths can swap textures and colors
+    without building new ones. Returned textures must not be mutated.
+    """
+
+    _textures: ClassVar[dict[tuple[str, ...], Texture]] = {}
+    # Keyed by `id` of interned textures, which are kept alive by `_textures`
+    _flipped_h: ClassVar[dict[int, Texture]] = {}
+    _highlighted: ClassVar[dict[ColorValue | None, ColorValue]] = {}
+
+    @classmethod
+    def texture(cls, texture: Texture) -> Texture:
+        """Get the shared texture with the same lines.
+
+        Args:
+            texture (Texture): texture to intern
+
+        Returns:
+            Texture: shared texture, which is the one given if first of its kind
+        """
+        key = tuple(texture)
+        interned = cls._textures.get(key)
+        if interned is None:
+            interned = cls._textures[key] = texture
+        return interned
+
+    @classmethod
+    def flipped_h(cls, texture: Texture) -> Texture:
+        """Get the shared, horizontally flipped version of texture.
+
+        Flipping a texture returned from here gives back the original shared texture.
+
+        Args:
+            texture (Texture): texture to flip
+
+        Returns:
+            Texture: shared flipped texture
+        """
+        flipped = cls._flipped_h.get(id(texture))
+        if flipped is None:
+            original = cls.texture(texture)
+            flipped = cls._flipped_h.get(id(original))
+            if flipped is None:
+                flipped = cls.texture(text.flip_lines_h(original))
+                cls._flipped_h[id(original)] = flipped
+                cls._flipped_h[id(flipped)] = original
+        return flipped
+
+    @classmethod
+    def highlighted(cls, color: ColorValue | None) -> ColorValue:
+        """Get the shared highlight color string, which reverses `color`.
+
+        Args:
+            color (ColorValue | None): color to highlight, `None` meaning white
+
+        Returns:
+            ColorValue: shared color string
+        """
+        highlighted = cls._highlighted.get(color)
+        if highlighted is None:
+            highlighted = cls._highlighted[color] = colex.REVERSE + (
+                color or colex.WHITE
+            )
+        return highlighted
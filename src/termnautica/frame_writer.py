@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from threading import Condition, Thread
+
+from charz.typing import FileLike
+
+
+def write_encoded(stream: FileLike[str], data: bytes) -> None:
+    """Write encoded text to binary buffer of stream, and flush.
+
+    Streams without a binary buffer, like `io.StringIO`, are given decoded text.
+
+    Args:
+        stream (FileLike[str]): text stream, like `sys.stdout`
+        data (bytes): text, encoded with the encoding of stream
+    """
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        stream.write(data.decode(getattr(stream, "encoding", None) or "utf-8"))
+        stream.flush()
+        return
+    buffer.write(data)
+    buffer.flush()
+
+
+class FrameWriter:
+    """Writes frames to a stream from a background thread.
+
+    Holds 2 frames at most: the one being written, and the next one waiting.
+    Handing off a frame never waits for the stream, so the game keeps running
+    while the terminal is slow to read. A waiting frame that is still not
+    picked up when the next frame is ready is stale, and can be taken back
+    with `take_pending`, so only the newest frame is written.
+
+    Attributes:
+        dropped_frames (int): frames taken back before being written
+        late_frames (int): frames still being written when a newer frame was handed off
+    """
+
+    def __init__(self, stream: FileLike[str]) -> None:
+        self.stream = stream
+        self.dropped_frames: int = 0
+        self.late_frames: int = 0
+        self._condition = Condition()
+        self._pending: bytes | None = None
+        self._submitted: int = 0  # Frames handed off, to tell if a write was late
+        self._is_running: bool = True
+        self._error: BaseException | None = None
+        self._thread = Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def take_pending(self) -> int:
+        """Take back waiting frame, if it is not being written yet.
+
+        Returns:
+            int: size of frame taken back, that will never be written, `0` if none
+        """
+        with self._condition:
+            if self._pending is None:
+                return 0
+            size = len(self._pending)
+            self._pending = None
+            self.dropped_frames += 1
+            return size
+
+    def submit(self, frame: bytes) -> None:
+        """Hand off frame to be written, after the frame being written.
+
+        Args:
+            frame (bytes): encoded frame, written as is
+
+        Raises:
+            BaseException: error raised by the stream, in the writer thread
+        """
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            if self._pending is not None:  # Not taken back, so write both in order
+                self._pending += frame
+            else:
+                self._pending = frame
+            self._submitted += 1
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Write frames handed off so far, then stop the writer thread."""
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        condition = self._condition
+        while True:
+            with condition:
+                while self._pending is None and self._is_running:
+                    condition.wait()
+                if self._pending is None:  # Closed, and nothing left to write
+                    return
+                frame = self._pending
+                self._pending = None
+                submitted = self._submitted
+            try:
+                write_encoded(self.stream, frame)
+            except BaseException as error:  # Raised on the game thread instead
+                with condition:
+                    self._error = error
+                return
+            with condition:
+                if self._submitted != submitted:
+                    self.late_frames += 1
@@ -1,6 +1,7 @@
 import colex
-from charz import AnimatedSprite, AnimationSet, Animation, Sprite, Vec2
+from charz import AnimatedSprite, AnimationSet, Animation, Node, Sprite, Vec2
 
+from .lifecycle import Lifecycle
 from .props import Collectable, Interactable
 from .item import ItemID
 
@@ -16,6 +17,8 @@ class Kelp(Interactable, Collectable, AnimatedSprite):
     is_playing = True
     current_animation = animations.Sway
     texture = current_animation.frames[0]
+    SPATIAL_MOVES = False
+    CULL_MOVES = False
 
     def __init__(self) -> None:
         self._supporting_sand = Sprite(
@@ -25,3 +28,8 @@ class Kelp(Interactable, Collectable, AnimatedSprite):
             texture=[",|."],
             color=colex.from_hex("#C2B280"),
         )
+        # Children are not freed with their parent
+        Lifecycle.on_freed(self, self._on_freed)
+
+    def _on_freed(self, _node: Node) -> None:
+        self._supporting_sand.queue_free()
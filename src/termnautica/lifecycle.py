@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Callable, ClassVar
+
+from charz import Scene, Group, Node
+from charz_core.typing import NodeID
+
+
+type FreedListener = Callable[[Node], None]
+type ReparentedListener = Callable[[Node, Node | None], None]
+
+
+class Lifecycle:
+    """Notifications for when nodes are freed or reparented.
+
+    Listeners are registered per node, so only interested parties are called,
+    instead of everyone polling `Scene.current.groups` each frame.
+    Registering the same listener twice for a node has no effect.
+    """
+
+    _freed: ClassVar[dict[NodeID, list[FreedListener]]] = {}
+    _reparented: ClassVar[dict[NodeID, list[ReparentedListener]]] = {}
+
+    @classmethod
+    def on_freed(cls, node: Node, listener: FreedListener) -> None:
+        """Call `listener` with `node`, right before `node` is freed.
+
+        Args:
+            node (Node): node to watch
+            listener (FreedListener): called with the freed node
+        """
+        listeners = cls._freed.setdefault(node.uid, [])
+        if listener not in listeners:
+            listeners.append(listener)
+
+    @classmethod
+    def off_freed(cls, node: Node, listener: FreedListener) -> None:
+        listeners = cls._freed.get(node.uid)
+        if listeners is not None and listener in listeners:
+            listeners.remove(listener)
+
+    @classmethod
+    def on_reparented(cls, node: Node, listener: ReparentedListener) -> None:
+        """Call `listener` with `node` and its new parent, when set with `reparent`.
+
+        Args:
+            node (Node): node to watch
+            listener (ReparentedListener): called with the node and its new parent
+        """
+        listeners = cls._reparented.setdefault(node.uid, [])
+        if listener not in listeners:
+            listeners.append(listener)
+
+    @classmethod
+    def off_reparented(cls, node: Node, listener: ReparentedListener) -> None:
+        listeners = cls._reparented.get(node.uid)
+        if listeners is not None and listener in listeners:
+            listeners.remove(listener)
+
+    @classmethod
+    def reparent(cls, node: Node, parent: Node | None) -> None:
+        """Set parent of node, and notify its listeners.
+
+        Args:
+            node (Node): node to reparent
+            parent (Node | None): new parent, or `None` to make it top level
+        """
+        if node.parent is parent:
+            return
+        node.parent = parent
+        # Copy, since listeners may unregister themselves
+        for listener in list(cls._reparented.get(node.uid, ())):
+            listener(node, parent)
+
+
+def emit_freed(current_scene: Scene) -> None:
+    """Notify listeners of nodes queued for freeing this frame.
+
+    Nodes queued by listeners are notified as well, before anything is freed.
+    """
+    nodes = current_scene.groups[Group.NODE]
+    notified: set[NodeID] = set()
+    while pending := current_scene._queued_nodes - notified:
+        notified |= pending
+        for uid in pending:
+            Lifecycle._reparented.pop(uid, None)
+            listeners = Lifecycle._freed.pop(uid, None)
+            node = nodes.get(uid)
+            if listeners is None or node is None:
+                continue
+            for listener in listeners:
+                listener(node)
+
+
+# Run right before `free_queued_nodes` (80)
+Scene.frame_tasks[81] = emit_freed
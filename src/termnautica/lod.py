@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from enum import Enum, auto
+from typing import Any, ClassVar, Self
+
+from charz import Scene, Group, Node2D, group, clamp
+
+from . import settings
+from .culling import Rect
+from .scheduler import Scheduler
+
+
+class LODTier(Enum):
+    VIEW = auto()  # Updated every frame
+    NEARBY = auto()  # Updated every `settings.LOD_NEARBY_INTERVAL` frames
+    DISTANT = auto()  # Not updated, only timers advance
+
+
+@group("lod")
+class LevelOfDetail:
+    """Mixin for nodes updated by `LOD`, at a rate based on distance to nearest camera.
+
+    Implement `lod_update` instead of `update`.
+    """
+
+    lod_tier: LODTier = LODTier.VIEW
+    lod_updated_at: int = 0  # Frame
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        instance.lod_updated_at = Scheduler.frame()
+        LOD._view.append(instance)  # Until tiers are picked
+        return instance
+
+    def lod_update(self, frames: int) -> None:
+        """Update node. Override in subclass.
+
+        Args:
+            frames (int): frames passed since last update, at least 1
+        """
+
+
+class LOD:
+    """Level of detail tiers, picked by where nodes are relative to camera views.
+
+    Views are reported by the screen, as last rendered. Nodes in a view,
+    or within `settings.LOD_VIEW_MARGIN` of it, are in view, and other nodes
+    within `settings.LOD_NEARBY_DISTANCE` of the center of a view are nearby.
+    Tiers are picked every `settings.LOD_CHECK_INTERVAL` frames,
+    and nearby nodes are spread out, so only a slice of them update each frame.
+    """
+
+    _view_bounds: ClassVar[list[Rect]] = []  # Views, grown by margin
+    _view_centers: ClassVar[list[tuple[float, float]]] = []
+    _view: ClassVar[list[LevelOfDetail]] = []
+    _nearby: ClassVar[list[LevelOfDetail]] = []
+
+    @classmethod
+    def set_views(cls, views: list[Rect]) -> None:
+        """Set views of cameras, as rendered.
+
+        Args:
+            views (list[Rect]): left, top, right and bottom of each view,
+                in global space
+        """
+        margin = settings.LOD_VIEW_MARGIN
+        cls._view_bounds = [
+            (left - margin, top - margin, right + margin, bottom + margin)
+            for left, top, right, bottom in views
+        ]
+        cls._view_centers = [
+            ((left + right) / 2, (top + bottom) / 2)
+            for left, top, right, bottom in views
+        ]
+
+    @classmethod
+    def tier_at(cls, x: float, y: float) -> LODTier:
+        """Get tier for global location.
+
+        Args:
+            x (float): global X
+            y (float): global Y
+
+        Returns:
+            LODTier: tier based on camera views, `LODTier.VIEW` before any
+                view is rendered
+        """
+        if not cls._view_bounds:
+            return LODTier.VIEW
+        for left, top, right, bottom in cls._view_bounds:
+            if left <= x < right and top <= y < bottom:
+                return LODTier.VIEW
+        nearby_distance_squared = settings.LOD_NEARBY_DISTANCE**2
+        for center_x, center_y in cls._view_centers:
+            if (x - center_x) ** 2 + (y - center_y) ** 2 <= nearby_distance_squared:
+                return LODTier.NEARBY
+        return LODTier.DISTANT
+
+    @staticmethod
+    def due_slot(frame: int) -> int:
+        """Get which nearby slots are updated in frame.
+
+        Slots are updated in turns, so slot `n` is due when
+        `n % settings.LOD_NEARBY_INTERVAL` equals the returned value.
+
+        Args:
+            frame (int): frame number
+
+        Returns:
+            int: due slot, in range `[0, settings.LOD_NEARBY_INTERVAL)`
+        """
+        return -frame % settings.LOD_NEARBY_INTERVAL
+
+    @classmethod
+    def pick_tiers(cls, current_scene: Scene) -> None:
+        cls._view = []
+        cls._nearby = []
+        for node in current_scene.get_group_members("lod", type_hint=LevelOfDetail):
+            assert isinstance(node, Node2D), f"`Node2D` base missing for {node}"
+            location = node.global_position
+            tier = node.lod_tier = cls.tier_at(location.x, location.y)
+            if tier is LODTier.VIEW:
+                cls._view.append(node)
+            elif tier is LODTier.NEARBY:
+                cls._nearby.append(node)
+
+
+def pick_lod_tiers(current_scene: Scene) -> None:
+    """Pick tiers, every `settings.LOD_CHECK_INTERVAL` frames."""
+    if Scheduler.frame() % settings.LOD_CHECK_INTERVAL:
+        return
+    LOD.pick_tiers(current_scene)
+
+
+def update_lod(current_scene: Scene) -> None:
+    """Update nodes in view, and the slice of nearby nodes that are due this frame.
+
+    Frames passed are capped at `settings.LOD_NEARBY_INTERVAL`,
+    so time spent distant or in the pool is not replayed.
+    """
+    frame = Scheduler.frame()
+    nodes = current_scene.groups[Group.NODE]
+    interval = settings.LOD_NEARBY_INTERVAL
+    due = LOD._nearby[LOD.due_slot(frame) :: interval]
+    for node in (*LOD._view, *due):
+        assert isinstance(node, Node2D)
+        if node.uid not in nodes:  # Freed since tiers were picked
+            continue
+        frames = clamp(frame - node.lod_updated_at, 1, interval)
+        node.lod_update(frames)
+        node.lod_updated_at = frame
+
+
+# Pick after `fire_timers` (95), so batched updates in `update_nodes` (90) can use it
+Scene.frame_tasks[91] = pick_lod_tiers
+# Run after `update_nodes` (90), before `update_spawner_activity` (85)
+Scene.frame_tasks[88] = update_lod
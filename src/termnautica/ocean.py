@@ -1,12 +1,16 @@
 import random
-from math import sin, floor, pi as PI
-from typing import Self, ClassVar
+from itertools import accumulate
+from math import sin, cos, floor, pi as PI
+from dataclasses import dataclass
+from typing import ClassVar
 
 import colex
-from charz import Sprite, Vec2, Vec2i
+from charz import Sprite, Node, Node2D, Vec2, Vec2i, group
+from charz_core.typing import NodeID
 
 from . import settings, spawners
-from .utils import groupwise, randf
+from .lifecycle import Lifecycle
+from .terrain import TerrainIndex
 
 
 type Coordinate = tuple[int, int]
@@ -33,22 +37,26 @@ DEPTH_LAYERS: tuple[Depth, ...] = (
 class Floor(Sprite):
     REST_DEPTH: int = 30
     ROCK_START_HEIGHT: int = -10
+    STRIP_HEIGHT: int = 8  # Rows per baked strip
     z_index = -1
     color = colex.from_hex("#C2B280")
+    transparency = " "
     texture = ["_"]
-    # TODO: Might be faster to have `points` be of type `dict[int, int]`,
-    #       where the key is X-position, and value is Y-position.
-    #       This way, an instant lookup can be done on X-position,
-    #       which is the first required information part
-    points: ClassVar[set[Coordinate]] = set()
+    index: ClassVar[TerrainIndex] = TerrainIndex()  # Used for collision
+    CULL_MOVES = False
+
+    @classmethod
+    def add_point(cls, point: Coordinate) -> None:
+        cls.index.add_point(point)
+
+    @classmethod
+    def remove_columns(cls, start_x: int, stop_x: int) -> None:
+        cls.index.remove_columns(start_x, stop_x)
 
     @classmethod
     def has_point_inside(cls, point: Coordinate) -> bool:
         # With "Inside", I mean under any tile in Y-axis (including tile location itself)
-        for floor_point in cls.points:
-            if floor_point[0] == point[0] and floor_point[1] <= point[1]:
-                return True
-        return False
+        return cls.index.has_point_inside(point)
 
     @classmethod
     def has_loose_point_inside(cls, point: Vec2) -> bool:
@@ -56,28 +64,111 @@ class Floor(Sprite):
         assert len(snapped) == 2
         return cls.has_point_inside(snapped)
 
+    @classmethod
+    def depth_inside(cls, point: Vec2) -> int:
+        """Calculate how far a point is inside the floor.
+
+        Args:
+            point (Vec2): global point, snapped the same way as `has_loose_point_inside`
+
+        Returns:
+            int: whole units to move up to get out of the floor, `0` if not inside
+        """
+        return cls.depth_at(point.x, point.y)
+
+    @classmethod
+    def depth_at(cls, x: float, y: float) -> int:
+        """Same as `depth_inside`, without building a `Vec2` for the point."""
+        surface = cls.index.surface_height_at(int(x))
+        if surface is None or int(y) < surface:
+            return 0
+        depth = floor(y) - surface + 1
+        # `int` snaps towards zero, so above Y `0` one more unit might be required
+        while int(y - depth) >= surface:
+            depth += 1
+        return depth
+
+    @classmethod
+    def overlaps_rect(cls, start: Coordinate, end: Coordinate) -> bool:
+        return cls.index.overlaps_rect(start, end)
+
 
-class Water(Sprite):
+class Water:
     REST_LEVEL: float = 0  # Where the ocean rests, in world space
     _WAVE_AMPLITUDE: float = 2
     _WAVE_INTERVAL: float = 3 * settings.FPS  # Frames
     _WAVE_DURATION: float = 3 * settings.FPS  # Frames
     _WAVE_LENGTH: float = 100
-    z_index = -1
-    color = colex.MEDIUM_AQUAMARINE  # + colex.from_rgb(0, 150, 255, background=True)
-    texture = ["~"]
     wave_time_remaining: ClassVar[float] = 0
-    _rest_location: Vec2
+    _wave_angle: ClassVar[float] = 0  # Of wave time, for current frame
+    # Per chunk; `cos` and `sin` of each column's phase
+    _phase_tables: ClassVar[dict[int, tuple[list[float], list[float]]]] = {}
+    # Per chunk; height of each column, for current frame,
+    # computed when columns of chunk are first looked up in a frame
+    _height_tables: ClassVar[dict[int, list[float]]] = {}
 
     @classmethod
     def advance_wave_time(cls) -> None:  # Call from `App.update`
         cls.wave_time_remaining -= 1
         if cls.wave_time_remaining < 0:
             cls.wave_time_remaining = cls._WAVE_DURATION
+        cls.update_height_tables()
+
+    @classmethod
+    def add_chunk(cls, index: int) -> None:
+        """Start keeping a height table for columns of chunk.
+
+        Args:
+            index (int): chunk index
+        """
+        start_x = index * settings.CHUNK_WIDTH
+        # Phase of each column is constant, so its `sin` and `cos` are stored.
+        # Using `sin(a + phi) = sin(a)cos(phi) + cos(a)sin(phi)`,
+        # only 1 `sin` and 1 `cos` is computed per height table, for all columns
+        phases = [
+            (start_x + column) / cls._WAVE_LENGTH
+            for column in range(settings.CHUNK_WIDTH)
+        ]
+        cls._phase_tables[index] = (
+            [cos(phi) for phi in phases],
+            [sin(phi) for phi in phases],
+        )
+        cls._height_tables.pop(index, None)
+
+    @classmethod
+    def remove_chunk(cls, index: int) -> None:
+        cls._phase_tables.pop(index, None)
+        cls._height_tables.pop(index, None)
+
+    @classmethod
+    def update_height_tables(cls) -> None:
+        """Update wave angle, and forget height tables, for current wave time.
+
+        Each table is computed when first looked up, so chunks that nothing
+        looks up in a frame cost nothing.
+        """
+        cls._wave_angle = 2 * PI * cls.wave_time_remaining / cls._WAVE_INTERVAL
+        cls._height_tables.clear()
+
+    @classmethod
+    def _height_table(cls, index: int) -> list[float] | None:
+        phase_table = cls._phase_tables.get(index)
+        if phase_table is None:  # Chunk not loaded
+            return None
+        phase_cos, phase_sin = phase_table
+        # Asin(cx + phi) + d
+        sin_part = cls._WAVE_AMPLITUDE * sin(cls._wave_angle)
+        cos_part = cls._WAVE_AMPLITUDE * cos(cls._wave_angle)
+        rest_level = cls.REST_LEVEL
+        table = cls._height_tables[index] = [
+            sin_part * column_cos + cos_part * column_sin + rest_level
+            for column_cos, column_sin in zip(phase_cos, phase_sin)
+        ]
+        return table
 
     @classmethod
     def wave_height_at(cls, wave_origin_x: float) -> float:
-        """Calculate wave height at global location
+        """Calculate wave height at global location, for current frame
 
         Args:
             wave_origin (Vec2): global origin of wave
@@ -87,19 +178,101 @@ class Water(Sprite):
         """
         # Write in math symbols that I'm used to
         phi = wave_origin_x / cls._WAVE_LENGTH
-        x = cls.wave_time_remaining / cls._WAVE_INTERVAL
-        # Asin(cx + phi) + d
-        return cls._WAVE_AMPLITUDE * sin(2 * PI * x + phi) + cls.REST_LEVEL
+        # Asin(cx + phi) + d, where cx is the same for all locations in a frame
+        return cls._WAVE_AMPLITUDE * sin(cls._wave_angle + phi) + cls.REST_LEVEL
+
+    @classmethod
+    def column_heights(cls, start_x: int, count: int) -> list[float]:
+        """Get wave heights of consecutive columns, for current frame
+
+        Args:
+            start_x (int): global X-position of first column
+            count (int): number of columns
+
+        Returns:
+            list[float]: global wave height of each column
+        """
+        heights: list[float] = []
+        column = start_x
+        stop_x = start_x + count
+        while column < stop_x:
+            index, offset = divmod(column, settings.CHUNK_WIDTH)
+            length = min(settings.CHUNK_WIDTH - offset, stop_x - column)
+            table = cls._height_tables.get(index) or cls._height_table(index)
+            if table is None:  # Chunk not loaded
+                heights.extend(
+                    cls.wave_height_at(column + step) for step in range(length)
+                )
+            else:
+                heights.extend(table[offset : offset + length])
+            column += length
+        return heights
+
+
+@group("clip-to-view")
+class OceanSurface(Sprite):
+    """Ocean surface of all loaded columns, as a single node.
+
+    Wave heights are read from the height tables of `Water`,
+    while the texture is rebuilt to only cover the columns in view,
+    before each camera renders.
+    """
+
+    _WAVE_CHAR: str = "~"
+    z_index = -1
+    color = colex.MEDIUM_AQUAMARINE  # + colex.from_rgb(0, 150, 255, background=True)
+    transparency = " "
+    texture = []
 
-    def save_rest_location(self) -> Self:
-        self._rest_location = self.global_position
-        return self
+    def __init__(self) -> None:
+        self._rest_offsets: dict[int, int] = {}
+        self._floating: dict[NodeID, tuple[Node2D, Vec2]] = {}
+
+    def add_columns(self, start_x: int, rest_offsets: list[int]) -> None:
+        for column, offset in enumerate(rest_offsets, start=start_x):
+            self._rest_offsets[column] = offset
+
+    def remove_columns(self, start_x: int, stop_x: int) -> None:
+        for column in range(start_x, stop_x):
+            self._rest_offsets.pop(column, None)
+
+    def attach(self, node: Node2D) -> None:
+        """Make node float on the waves, using its current location as rest location.
+
+        Args:
+            node (Node2D): node to float, usually top level
+        """
+        self._floating[node.uid] = (node, node.global_position)
+        Lifecycle.on_freed(node, self._detach)
+
+    def _detach(self, node: Node) -> None:
+        del self._floating[node.uid]
 
     def update(self) -> None:
-        # Asin(cx + phi) + d
-        self.position.y = floor(
-            self.wave_height_at(self._rest_location.x) + self._rest_location.y
-        )
+        for node, rest_location in self._floating.values():
+            node.set_global_y(
+                floor(Water.wave_height_at(rest_location.x) + rest_location.y)
+            )
+
+    def clip_to_view(self, start: Vec2, size: Vec2i) -> None:
+        first = floor(start.x)
+        # Include 1 extra column, in case view is not aligned to the grid
+        wave_heights = Water.column_heights(first, size.x + 1)
+        heights = [
+            (column, floor(height + offset))
+            for column, height in enumerate(wave_heights)
+            if (offset := self._rest_offsets.get(first + column)) is not None
+        ]
+        if not heights:
+            self.texture = []
+            return
+        top = min(height for _column, height in heights)
+        bottom = max(height for _column, height in heights)
+        rows = [[" "] * len(wave_heights) for _ in range(bottom - top + 1)]
+        for column, height in heights:
+            rows[height - top][column] = self._WAVE_CHAR
+        self.texture = ["".join(row) for row in rows]
+        self.position = Vec2(first, top)
 
 
 class Abyss:
@@ -108,127 +281,229 @@ class Abyss:
     MAX_WIDTH: ClassVar[int] = 20
     MIN_DEPTH: ClassVar[int] = 20
     MAX_DEPTH: ClassVar[int] = 60
-    length_left: ClassVar[int] = 0
-    current_depth: ClassVar[int] = 0
-    just_began: ClassVar[bool] = False
-    just_ended: ClassVar[bool] = False
-    floor_points: ClassVar[set[Coordinate]] = set()
-
-
-def generate_water() -> None:
-    for x in range(settings.WORLD_WIDTH):
-        (
-            Water()
-            .with_position(
-                x=(x - settings.WORLD_WIDTH // 2),
-                y=random.randint(0, 1),
-            )
-            .save_rest_location()
-        )
 
 
-def attempt_generate_spawner_at(location: Vec2) -> None:
+# Keyed by (previous rise is down, sign of next rise), where Y grows downward
+# FIXME: Implement properly - Almost working
+_STEEP: tuple[bool, int] = (True, 1)
+_SLOPE_TEXTURES: dict[tuple[bool, int], str] = {
+    _STEEP: "|",  # May be swapped for "<" or ">"
+    (True, 0): Floor.texture[0],
+    (False, 0): Floor.texture[0],
+    (True, -1): "V",
+    (False, 1): "A",
+    (False, -1): "/",
+}
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class FloorData:
+    points: list[Coordinate]  # Used for collision
+    tiles: list[tuple[Coordinate, str]]  # Location and texture
+    spawners: list[tuple[type[spawners.Spawner], Vec2]]  # Kind and global location
+
+
+def generate_water(rng: random.Random, width: int) -> list[int]:
+    return [rng.randint(0, 1) for _ in range(width)]
+
+
+def roll_spawner(rng: random.Random) -> type[spawners.Spawner] | None:
     all_spawners = list(SPAWN_CHANCES.keys())
-    random.shuffle(all_spawners)
+    rng.shuffle(all_spawners)
     for spawner in all_spawners:
         chance = SPAWN_CHANCES[spawner]
-        if random.randint(1, 100) <= chance:
-            spawner().with_global_position(location + spawner.position)
-            break
-
-
-def generate_floor() -> None:
-    depth = 0
-    texture_points: list[Vec2] = []
-
-    for x_position in range(-settings.WORLD_WIDTH // 2, settings.WORLD_WIDTH // 2):
-        # Check if starting to generate an abyss
-        if not Abyss.length_left and random.randint(1, Abyss.SPAWN_CHANCE) == 1:
-            Abyss.just_began = True
-            Abyss.current_depth = random.randint(
-                Abyss.MIN_DEPTH,
-                Abyss.MAX_DEPTH,
-            )
-            Abyss.length_left = random.randint(
-                Abyss.MIN_WIDTH,
-                Abyss.MAX_WIDTH,
-            )
-
-        depth += randf(-1, 1)
-        point = Vec2i(x_position, int(depth) + Floor.REST_DEPTH)
-
-        if Abyss.length_left:
-            point.y += Abyss.current_depth
-            Abyss.floor_points.add((point.x, point.y))
-            Abyss.length_left -= 1
-            if Abyss.length_left == 0:
-                Abyss.just_ended = True
-
-        # Temp point - For deciding texture
-        texture_points.append(point)
-
-        # Generate abyss walls + `CrystalSpawner`
-        if Abyss.just_began or Abyss.just_ended:
-            Abyss.just_ended = False
-            Abyss.just_began = False
-            for i in range(Abyss.current_depth):
-                abyss_wall_point = Vec2i(
-                    x_position,
-                    int(depth) + Floor.REST_DEPTH + i,
-                )
-                abyss_wall_point.x += random.randint(-1, 0)
-                Floor.points.add((abyss_wall_point.x, abyss_wall_point.y))
-                texture_points.append(abyss_wall_point)
-                if random.randint(1, 30) == 1:
-                    spawners.CrystalSpawner().with_global_position(
-                        abyss_wall_point + spawners.CrystalSpawner.position
-                    )
-                elif random.randint(1, 80) == 1:
-                    spawners.SwordFishSpawner().with_global_position(
-                        abyss_wall_point + spawners.CrystalSpawner.position
-                    )
-
-        # Store point over time - Used for collision
-        Floor.points.add((point.x, point.y))
-
-    # FIXME: Implement properly - Almost working
-    for prev, curr, peak in groupwise(texture_points, n=3):
-        is_climbing = peak.y - curr.y < 0
-        is_flatting = abs(peak.y - curr.y) < 0.8
-        was_dropping = curr.y - prev.y > 0
-        is_steep = curr.y - prev.y >= 1 and peak.y - curr.y >= 1
-        if is_steep:
-            ocean_floor = Floor(position=curr, texture=["|"])
-            if random.randint(1, 3) == 1:
-                if random.randint(1, 2) == 1:
-                    ocean_floor.texture = ["<"]
-                else:
-                    ocean_floor.texture = [">"]
-        elif is_flatting:
-            ocean_floor = Floor(position=curr)
-        elif is_climbing and was_dropping:
-            ocean_floor = Floor(position=curr, texture=["V"])
-        elif not is_climbing and not was_dropping:
-            ocean_floor = Floor(position=curr, texture=["A"])
-        elif is_climbing:
-            ocean_floor = Floor(position=curr, texture=["/"])
-        elif not is_climbing:
-            ocean_floor = Floor(position=curr, texture=["\\"])
-        else:
-            ocean_floor = Floor(position=curr)
-        # Make rock color if high up
-        if curr.y <= Floor.ROCK_START_HEIGHT:
-            ocean_floor.color = colex.GRAY
-        if is_steep:  # Don't generate spawners in too steep terrain
+        if rng.randint(1, 100) <= chance:
+            return spawner
+    return None
+
+
+def generate_floor(
+    rng: random.Random,
+    *,
+    start_x: int,
+    width: int,
+    start_depth: float,
+    end_depth: float,
+) -> FloorData:
+    """Generate floor of a section, without creating any nodes.
+
+    Only `rng` is used for randomness, so this can run outside the main thread.
+    The depth follows a random walk, that is bent to start at `start_depth`,
+    and end at `end_depth`, so that neighbouring sections line up.
+
+    Depths, abyss offsets and slope textures are computed a whole list at a time.
+    Only the parts that draw from `rng` run per event, in the same order as before,
+    so a given seed still gives the same floor.
+
+    Args:
+        rng (random.Random): random source, seeded for this section
+        start_x (int): global X-position of first column
+        width (int): number of columns
+        start_depth (float): depth before first column
+        end_depth (float): depth of last column
+
+    Returns:
+        FloorData: floor tiles, collision points and spawner locations
+    """
+    # Depth profile
+    steps = [rng.uniform(-1, 1) for _ in range(width)]
+    drift = (sum(steps) - (end_depth - start_depth)) / width
+    depths = list(accumulate([step - drift for step in steps], initial=start_depth))
+    surface = [int(depth) + Floor.REST_DEPTH for depth in depths[1:]]
+    heights = surface.copy()  # Surface, lowered in abysses
+    columns = range(start_x, start_x + width)
+
+    # Abysses and their walls - Rolled column by column, as they consume `rng`
+    walls: list[tuple[int, list[Coordinate]]] = []  # Column index, wall points
+    spawner_locations: list[tuple[type[spawners.Spawner], Vec2]] = []
+    abyss_points: set[Coordinate] = set()
+    column = 0
+    while column < width:
+        if rng.randint(1, Abyss.SPAWN_CHANCE) != 1:
+            column += 1
             continue
-        snapped = (
-            floor(curr.x),
-            floor(curr.y),
-        )
-        if snapped in Abyss.floor_points:
-            if random.randint(1, 8) == 1:
-                spawners.DiamondOreSpawner().with_global_position(
-                    curr + spawners.DiamondOreSpawner.position
+        abyss_depth = rng.randint(Abyss.MIN_DEPTH, Abyss.MAX_DEPTH)
+        length = rng.randint(Abyss.MIN_WIDTH, Abyss.MAX_WIDTH)
+        # Only place abyss if it fits inside section, walls included
+        if length > width - column:
+            column += 1
+            continue
+        end = column + length
+        heights[column:end] = [height + abyss_depth for height in heights[column:end]]
+        abyss_points.update(zip(columns[column:end], heights[column:end]))
+        # Generate abyss walls + `CrystalSpawner`, where abyss begins and ends
+        for wall_column in dict.fromkeys((column, end - 1)):
+            wall_points: list[Coordinate] = []
+            for i in range(abyss_depth):
+                # Keep walls inside section
+                x = max(columns[wall_column] + rng.randint(-1, 0), start_x)
+                y = surface[wall_column] + i
+                wall_points.append((x, y))
+                if rng.randint(1, 30) == 1:
+                    spawner = spawners.CrystalSpawner
+                elif rng.randint(1, 80) == 1:
+                    spawner = spawners.SwordFishSpawner
+                else:
+                    continue
+                offset = spawners.CrystalSpawner.position
+                spawner_locations.append((spawner, Vec2(x + offset.x, y + offset.y)))
+            walls.append((wall_column, wall_points))
+        column = end
+
+    # Splice wall points in after the column they belong to
+    floor_points = list(zip(columns, heights))
+    points: list[Coordinate] = []  # Used for collision
+    texture_points: list[Coordinate] = [  # Temp points - For deciding texture
+        # Section edges are padded with a point at the connecting depth
+        (start_x - 1, int(start_depth) + Floor.REST_DEPTH)
+    ]
+    done = 0
+    for wall_column, wall_points in walls:
+        points += floor_points[done:wall_column]
+        points += wall_points
+        texture_points += floor_points[done : wall_column + 1]
+        texture_points += wall_points
+        done = wall_column
+        points.append(floor_points[done])
+        done += 1
+    points += floor_points[done:]
+    texture_points += floor_points[done:]
+    texture_points.append((start_x + width, int(end_depth) + Floor.REST_DEPTH))
+
+    # Slope textures - Each tile looks at the point before and after it
+    ys = [y for _x, y in texture_points]
+    rises = [next_y - y for y, next_y in zip(ys, ys[1:])]
+    slope_keys = [
+        (rise > 0, (next_rise > 0) - (next_rise < 0))
+        for rise, next_rise in zip(rises, rises[1:])
+    ]
+    textures = [_SLOPE_TEXTURES[key] for key in slope_keys]
+
+    # Steep tile variants and spawners - Rolled tile by tile, as they consume `rng`
+    tile_points = texture_points[1:-1]
+    for index, (x, y) in enumerate(tile_points):
+        if slope_keys[index] == _STEEP:
+            if rng.randint(1, 3) == 1:
+                textures[index] = "<" if rng.randint(1, 2) == 1 else ">"
+            continue  # Don't generate spawners in too steep terrain
+        if (x, y) in abyss_points:
+            if rng.randint(1, 8) == 1:
+                offset = spawners.DiamondOreSpawner.position
+                spawner_locations.append(
+                    (spawners.DiamondOreSpawner, Vec2(x + offset.x, y + offset.y))
                 )
             continue
-        attempt_generate_spawner_at(curr)
+        if (spawner := roll_spawner(rng)) is not None:
+            offset = spawner.position
+            spawner_locations.append((spawner, Vec2(x + offset.x, y + offset.y)))
+
+    tiles = list(zip(tile_points, textures))
+    return FloorData(points=points, tiles=tiles, spawners=spawner_locations)
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class FloorStrip:
+    position: Coordinate  # Top left corner
+    texture: list[str]
+    is_rock: bool
+
+
+def bake_floor(tiles: list[tuple[Coordinate, str]]) -> list[FloorStrip]:
+    """Merge floor tiles into a few multi-line strips.
+
+    Tiles are grouped into bands of `Floor.STRIP_HEIGHT` rows,
+    and by whether they use rock color, since a sprite only has 1 color.
+    Does not create any nodes, so this can run outside the main thread.
+
+    Args:
+        tiles (list[tuple[Coordinate, str]]): location and texture of each tile
+
+    Returns:
+        list[FloorStrip]: strips covering all tiles
+    """
+    bands: dict[tuple[bool, int], list[tuple[Coordinate, str]]] = {}
+    for tile in tiles:
+        y = tile[0][1]
+        # Make rock color if high up
+        key = (y <= Floor.ROCK_START_HEIGHT, y // Floor.STRIP_HEIGHT)
+        bands.setdefault(key, []).append(tile)
+    strips: list[FloorStrip] = []
+    for (is_rock, _band), band_tiles in bands.items():
+        left = min(x for (x, _y), _char in band_tiles)
+        right = max(x for (x, _y), _char in band_tiles)
+        top = min(y for (_x, y), _char in band_tiles)
+        bottom = max(y for (_x, y), _char in band_tiles)
+        rows = [[" "] * (right - left + 1) for _ in range(bottom - top + 1)]
+        for (x, y), char in band_tiles:  # Later tiles are drawn on top
+            rows[y - top][x - left] = char
+        strips.append(
+            FloorStrip(
+                position=(left, top),
+                texture=["".join(row) for row in rows],
+                is_rock=is_rock,
+            )
+        )
+    return strips
+
+
+def build_floor(data: FloorData, strips: list[FloorStrip]) -> list[Sprite]:
+    """Register collision, and create floor strips and spawners from generated data.
+
+    Args:
+        data (FloorData): generated floor data, used for collision and spawners
+        strips (list[FloorStrip]): baked floor tiles, used for rendering
+
+    Returns:
+        list[Sprite]: nodes created
+    """
+    for point in data.points:
+        Floor.add_point(point)
+    nodes: list[Sprite] = []
+    for strip in strips:
+        ocean_floor = Floor(position=Vec2(*strip.position), texture=strip.texture)
+        if strip.is_rock:
+            ocean_floor.color = colex.GRAY
+        nodes.append(ocean_floor)
+    for spawner, location in data.spawners:
+        nodes.append(spawner().with_global_position(location))
+    return nodes
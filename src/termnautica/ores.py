@@ -1,21 +1,31 @@
 import random
+from typing import Any, Self
 
 import pygame
 import colex
 from colex import ColorValue
-from charz import Sprite
+from charz import Sprite, Vec2
 
 from . import settings
 from .props import Collectable, Interactable
 from .item import ItemID
-from .particles import ShineSpark
+from .lod import LevelOfDetail, LODTier
+from .particles import ParticleSystem, SHINE_SPARK
+from .pool import Pooled
+from .scheduler import Scheduler
 
 
-class Ore(Interactable, Collectable, Sprite):
+class Ore(Pooled, Interactable, Collectable, Sprite):
     _SOUND_COLLECT = pygame.mixer.Sound(settings.SOUNDS_FOLDER / "collect" / "ore.wav")
     color = colex.DARK_GRAY
     z_index = 1
     texture = ["<Unset Ore Texture>"]
+    SPATIAL_MOVES = False
+    CULL_MOVES = False
+
+    def reset(self) -> None:
+        self.loose_focus()  # May have been freed while highlighted
+        self.track_spatial()
 
 
 class Gold(Ore):
@@ -49,7 +59,7 @@ class Coal(Ore):
     texture = ["▒▓▒"]
 
 
-class Crystal(Ore):
+class Crystal(LevelOfDetail, Ore):
     _SOUND_COLLECT = pygame.mixer.Sound(
         settings.SOUNDS_FOLDER / "collect" / "crystal.wav"
     )
@@ -65,26 +75,43 @@ class Crystal(Ore):
     ]
     color = colex.PURPLE
     texture = ["<*."]
-    _color_change_cooldown: int = 0
-    _shine_cooldown: int = 0
 
-    def update(self) -> None:
-        self._color_change_cooldown -= 1
-        if self._color_change_cooldown <= 0:
-            self._color_change_cooldown = random.randint(
+    # Schedule in `__new__`, so `Sprite.__init__` arguments are kept
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        instance._schedule_timers()
+        return instance
+
+    def reset(self) -> None:
+        super().reset()
+        self._schedule_timers()
+
+    def _schedule_timers(self) -> None:
+        Scheduler.call_in(0, self._change_color, owner=self)
+        Scheduler.call_in(0, self._shine, owner=self)
+
+    def _change_color(self) -> None:
+        self.color = random.choice(self._COLORS)
+        Scheduler.call_in(
+            random.randint(
                 self._MIN_COLOR_CHANGE_INTERVAL,
                 self._MAX_COLOR_CHANGE_INTERVAL,
-            )
-            self.color = random.choice(self._COLORS)
-
-        self._shine_cooldown -= 1
-        if self._shine_cooldown <= 0:
-            self._shine_cooldown = random.randint(
+            ),
+            self._change_color,
+            owner=self,
+        )
+
+    def _shine(self) -> None:
+        if self.lod_tier is LODTier.VIEW:  # Nobody sees sparks elsewhere
+            ParticleSystem.emit(SHINE_SPARK, self.global_position + Vec2(1, 0))
+        Scheduler.call_in(
+            random.randint(
                 self._MIN_SHINE_INTERVAL,
                 self._MAX_SHINE_INTERVAL,
-            )
-            spark = ShineSpark().with_global_position(self.global_position)
-            spark.position.x += 1
+            ),
+            self._shine,
+            owner=self,
+        )
 
 
 class Diamond(Ore):
@@ -0,0 +1,145 @@
+from enum import StrEnum
+from typing import ClassVar
+
+
+type RGB = tuple[int, int, int]
+
+
+class ColorDepth(StrEnum):
+    """Colors a terminal can show, used to pick how colors are written."""
+
+    TRUECOLOR = "truecolor"
+    ANSI_256 = "256"
+    ANSI_16 = "16"
+    MONOCHROME = "mono"
+
+
+# Channel levels of the 6x6x6 color cube, in the 256 color palette
+_CUBE_LEVELS: tuple[int, ...] = (0, 95, 135, 175, 215, 255)
+# Colors of the 16 color palette, as xterm shows them
+_ANSI_16: tuple[RGB, ...] = (
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+)
+
+
+def _distance_squared(a: RGB, b: RGB) -> int:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _nearest_16_index(rgb: RGB) -> int:
+    return min(range(16), key=lambda index: _distance_squared(rgb, _ANSI_16[index]))
+
+
+def _xterm_256_rgb(index: int) -> RGB:
+    if index < 16:
+        return _ANSI_16[index]
+    if index < 232:
+        index -= 16
+        return (
+            _CUBE_LEVELS[index // 36],
+            _CUBE_LEVELS[index // 6 % 6],
+            _CUBE_LEVELS[index % 6],
+        )
+    level = 8 + (index - 232) * 10
+    return (level, level, level)
+
+
+class Palette:
+    """Lookup tables for writing colors with fewer colors than truecolor.
+
+    Tables are built once, when imported. Colors are given and returned
+    as SGR color parameters, like `"38;2;194;178;128"` or `"41"`.
+    """
+
+    # Nearest cube level and gray ramp step, by channel value
+    _cube_index: ClassVar[list[int]] = [
+        min(range(6), key=lambda index: abs(_CUBE_LEVELS[index] - value))
+        for value in range(256)
+    ]
+    _gray_index: ClassVar[list[int]] = [
+        min(23, max(0, round((value - 8) / 10))) for value in range(256)
+    ]
+    # Nearest of 16 colors, by 4 high bits of each channel
+    _nearest_16: ClassVar[list[int]] = [
+        _nearest_16_index((red << 4 | 8, green << 4 | 8, blue << 4 | 8))
+        for red in range(16)
+        for green in range(16)
+        for blue in range(16)
+    ]
+    _256_to_16: ClassVar[list[int]] = [
+        _nearest_16_index(_xterm_256_rgb(index)) for index in range(256)
+    ]
+
+    @classmethod
+    def index_256(cls, rgb: RGB) -> int:
+        """Get nearest color of the 256 color palette, from cube or gray ramp.
+
+        Args:
+            rgb (RGB): truecolor
+
+        Returns:
+            int: palette index, in range `[16, 255]`
+        """
+        red, green, blue = rgb
+        cube = (cls._cube_index[red], cls._cube_index[green], cls._cube_index[blue])
+        gray = cls._gray_index[(red + green + blue) // 3]
+        cube_index = 16 + 36 * cube[0] + 6 * cube[1] + cube[2]
+        gray_index = 232 + gray
+        if _distance_squared(rgb, _xterm_256_rgb(gray_index)) < _distance_squared(
+            rgb, _xterm_256_rgb(cube_index)
+        ):
+            return gray_index
+        return cube_index
+
+    @classmethod
+    def index_16(cls, rgb: RGB) -> int:
+        red, green, blue = rgb
+        return cls._nearest_16[(red >> 4) << 8 | (green >> 4) << 4 | blue >> 4]
+
+    @classmethod
+    def color(cls, parameter: str, depth: ColorDepth) -> str | None:
+        """Convert SGR color parameter to color depth.
+
+        Args:
+            parameter (str): foreground or background color parameter
+            depth (ColorDepth): colors to convert to
+
+        Returns:
+            str | None: converted parameter, `None` for no color
+        """
+        if depth == ColorDepth.MONOCHROME:
+            return None
+        if depth == ColorDepth.TRUECOLOR:
+            return parameter
+        values = parameter.split(";")
+        is_background = values[0].startswith(("4", "10"))
+        if len(values) == 1:  # Already in 16 color palette
+            return parameter
+        if values[1] == "2":
+            rgb = (int(values[2]), int(values[3]), int(values[4]))
+            if depth == ColorDepth.ANSI_256:
+                return f"{values[0]};5;{cls.index_256(rgb)}"
+            index = cls.index_16(rgb)
+        else:
+            index = int(values[2])
+            if depth == ColorDepth.ANSI_256:
+                return parameter
+            index = cls._256_to_16[index]
+        if index < 8:
+            return str((40 if is_background else 30) + index)
+        return str((100 if is_background else 90) + index - 8)
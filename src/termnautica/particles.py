@@ -1,11 +1,29 @@
+from __future__ import annotations
+
 import random
-from math import pi as PI
-from typing import TYPE_CHECKING
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from math import floor, pi as PI
+from typing import TYPE_CHECKING, ClassVar
 
 import colex
 from colex import ColorValue
-from charz import Sprite, AnimatedSprite, AnimationSet, Animation, Vec2, text
-
+from charz import (
+    Scene,
+    Group,
+    Node2D,
+    Sprite,
+    AnimatedSprite,
+    AnimationSet,
+    Animation,
+    Vec2,
+    Vec2i,
+    group,
+)
+
+from .flyweight import Flyweight
+from .pool import Pooled
+from .scheduler import Scheduler
 from .utils import randf
 
 # Type checking for lazy loading
@@ -22,7 +40,7 @@ def _ensure_ocean_water() -> None:
         from .ocean import Water
 
 
-class Bubble(AnimatedSprite):
+class Bubble(Pooled, AnimatedSprite):
     _FLOAT_SPEED: float = 0.5
     _COLORS: list[ColorValue] = [
         colex.AQUA,
@@ -37,12 +55,19 @@ class Bubble(AnimatedSprite):
     is_playing = True
     current_animation = animations.Float
     texture = current_animation.frames[0]
+    _FLIPPED_POP_FRAMES = list(map(Flyweight.flipped_h, animations.Pop.frames))
 
     def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        # Shared frame lists, swapped instead of flipped per bubble
         if random.randint(0, 1):
-            self.animations.Pop.frames = list(
-                map(text.flip_lines_h, self.animations.Pop.frames)
-            )
+            self.animations.Pop.frames = self._FLIPPED_POP_FRAMES
+        else:
+            self.animations.Pop.frames = self.__class__.animations.Pop.frames
+        self.play("Float")
+        self.texture = self.animations.Float.frames[0]
 
     def is_submerged(self) -> bool:
         _ensure_ocean_water()
@@ -61,82 +86,159 @@ class Bubble(AnimatedSprite):
             self.play("Float")
 
 
-class Particle(Sprite):
-    _INITAL_SPEED: float = 1
-    _INITIAL_DIRECTION: Vec2 = Vec2.UP
-    _CONE: float = PI / 2
-    _GRAVITY_DIRECTION: Vec2 = Vec2.DOWN
-    _GRAVITY_STRENGTH: float = 1
-    _COLORS: list[ColorValue] = []
-    _TEXTURES: list[list[str]] = []
-    _LIFETIME = 10
-    _time_remaining: int = 0
-    _velocity: Vec2
-
-    def __init__(self) -> None:
-        self._time_remaining = self._LIFETIME
-        self.texture = random.choice(self._TEXTURES)
-        self.color = random.choice(self._COLORS)
-        direction = self._INITIAL_DIRECTION.normalized().rotated(
-            randf(self._CONE, -self._CONE)
-        )
-        self._velocity = direction * self._INITAL_SPEED
-
-    def update(self) -> None:
-        self._time_remaining -= 1
-        if self._time_remaining <= 0:
-            self.queue_free()
-        self._velocity += self._GRAVITY_DIRECTION.normalized() * self._GRAVITY_STRENGTH
-        self.position += self._velocity
-        self.texture = random.choice(self._TEXTURES)
-        self.color = random.choice(self._COLORS)
-
-
-class Blood(Particle):
-    _INITAL_SPEED = 0.9
-    _CONE = PI / 3
-    _GRAVITY_STRENGTH = 0.1
-    _COLORS = [
+@dataclass(kw_only=True, frozen=True, slots=True, eq=False)
+class ParticlePreset:
+    initial_speed: float = 1
+    initial_direction: Vec2 = field(default_factory=Vec2.UP.copy)
+    cone: float = PI / 2
+    gravity_direction: Vec2 = field(default_factory=Vec2.DOWN.copy)
+    gravity_strength: float = 1
+    colors: tuple[ColorValue, ...]
+    chars: tuple[str, ...]
+    lifetime: int = 10  # Frames
+    z_index: int = 0
+
+
+BLOOD = ParticlePreset(
+    initial_speed=0.9,
+    cone=PI / 3,
+    gravity_strength=0.1,
+    colors=(
         colex.CRIMSON,
         colex.PINK,
         colex.INDIAN_RED,
-    ]
-    _TEXTURES = [
-        ["*"],
-        ["'"],
-    ]
-
-
-class Fire(Particle):
-    _INITAL_SPEED = 2
-    _CONE = PI / 9
-    _GRAVITY_STRENGTH = 0.2
-    _COLORS = [
+    ),
+    chars=("*", "'"),
+)
+FIRE = ParticlePreset(
+    initial_speed=2,
+    cone=PI / 9,
+    gravity_strength=0.2,
+    colors=(
         colex.RED,
         colex.TOMATO,
         colex.GOLD,
         colex.CRIMSON,
         colex.DARK_ORANGE,
         colex.DARK_RED,
-    ]
-    _TEXTURES = [
-        ["^"],
-        ["*"],
-        ["."],
-    ]
-
-
-class ShineSpark(Particle):
-    _LIFETIME = 3
-    _INITAL_SPEED = 0.8
-    _GRAVITY_STRENGTH = 0
-    _COLORS = [
+    ),
+    chars=("^", "*", "."),
+)
+SHINE_SPARK = ParticlePreset(
+    lifetime=3,
+    initial_speed=0.8,
+    gravity_strength=0,
+    colors=(
         colex.PURPLE,
         colex.ANTIQUE_WHITE,
         colex.PINK,
-    ]
-    _TEXTURES = [
-        ["*"],
-        ["."],
-    ]
-    z_index = 1
+    ),
+    chars=("*", "."),
+    z_index=1,
+)
+
+
+@group("clip-to-view")
+class ParticleSystem(Node2D):
+    """All live particles of a preset, stored as parallel lists.
+
+    Particles are moved in 1 batched step per frame, and drawn with
+    1 child sprite per palette color, which is rebuilt for each view.
+    Since all particles of a preset have the same lifetime,
+    they expire in the order they were emitted, from the front of the lists.
+    """
+
+    _systems: ClassVar[dict[ParticlePreset, ParticleSystem]] = {}
+
+    def __init__(self, preset: ParticlePreset) -> None:
+        self._preset = preset
+        gravity = preset.gravity_direction.normalized() * preset.gravity_strength
+        self._gravity_x = gravity.x
+        self._gravity_y = gravity.y
+        self._x: list[float] = []
+        self._y: list[float] = []
+        self._velocity_x: list[float] = []
+        self._velocity_y: list[float] = []
+        self._birth: list[int] = []  # Frame emitted
+        self._layers = [
+            Sprite(self, color=color, z_index=preset.z_index, transparency=" ")
+            for color in preset.colors
+        ]
+
+    @classmethod
+    def emit(cls, preset: ParticlePreset, location: Vec2, count: int = 1) -> None:
+        """Emit particles at location, using the system of preset.
+
+        Args:
+            preset (ParticlePreset): kind of particles
+            location (Vec2): global location
+            count (int, optional): number of particles. Defaults to 1.
+        """
+        system = cls._systems.get(preset)
+        if system is None or system.uid not in Scene.current.groups[Group.NODE]:
+            system = cls._systems[preset] = cls(preset)
+        system.add(location, count)
+
+    def add(self, location: Vec2, count: int = 1) -> None:
+        direction = self._preset.initial_direction.normalized()
+        cone = self._preset.cone
+        speed = self._preset.initial_speed
+        frame = Scheduler.frame()
+        for _ in range(count):
+            angle = randf(cone, -cone)
+            velocity = direction.rotated(angle) * speed
+            self._x.append(location.x)
+            self._y.append(location.y)
+            self._velocity_x.append(velocity.x)
+            self._velocity_y.append(velocity.y)
+            self._birth.append(frame)
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    def update(self) -> None:
+        # Expire from the front
+        expired = bisect_right(self._birth, Scheduler.frame() - self._preset.lifetime)
+        if expired:
+            del self._x[:expired]
+            del self._y[:expired]
+            del self._velocity_x[:expired]
+            del self._velocity_y[:expired]
+            del self._birth[:expired]
+        gravity_x = self._gravity_x
+        gravity_y = self._gravity_y
+        self._velocity_x = [velocity + gravity_x for velocity in self._velocity_x]
+        self._velocity_y = [velocity + gravity_y for velocity in self._velocity_y]
+        self._x = [x + velocity for x, velocity in zip(self._x, self._velocity_x)]
+        self._y = [y + velocity for y, velocity in zip(self._y, self._velocity_y)]
+
+    def clip_to_view(self, start: Vec2, size: Vec2i) -> None:
+        left = floor(start.x)
+        top = floor(start.y)
+        # Include 1 extra cell, in case view is not aligned to the grid
+        width = size.x + 1
+        height = size.y + 1
+        visible = [
+            (column, row)
+            for x, y in zip(self._x, self._y)
+            if 0 <= (column := floor(x) - left) < width
+            and 0 <= (row := floor(y) - top) < height
+        ]
+        grids: list[list[list[str]] | None] = [None] * len(self._layers)
+        if visible:
+            # Pick a new color and char for each particle, each frame
+            palette = random.choices(range(len(self._layers)), k=len(visible))
+            chars = random.choices(self._preset.chars, k=len(visible))
+            right = max(column for column, _row in visible) + 1
+            bottom = max(row for _column, row in visible) + 1
+            for (column, row), index, char in zip(visible, palette, chars):
+                grid = grids[index]
+                if grid is None:
+                    grid = grids[index] = [[" "] * right for _ in range(bottom)]
+                grid[row][column] = char
+        for layer, grid in zip(self._layers, grids):
+            if grid is None:
+                layer.texture = []
+                continue
+            layer.texture = ["".join(row) for row in grid]
+            layer.global_position = Vec2(left, top)
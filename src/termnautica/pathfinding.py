@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from collections import deque
+from math import floor
+from typing import TYPE_CHECKING, ClassVar
+
+from charz import Scene, Node, Node2D, Vec2
+from charz_core.typing import NodeID
+
+from . import settings
+from .lifecycle import Lifecycle
+
+# Type checking for lazy loading
+if TYPE_CHECKING:
+    from .ocean import Water, Floor
+else:
+    Water = Floor = None
+
+
+def _ensure_ocean() -> None:
+    # Lazy loading - A quick workaround
+    global Water, Floor
+    if Water is None:
+        from .ocean import Water, Floor
+
+
+type Cell = tuple[int, int]
+
+
+# Steps to neighbour cells, with orthogonal steps first, so they are preferred
+_STEPS: tuple[Cell, ...] = (
+    (1, 0),
+    (-1, 0),
+    (0, 1),
+    (0, -1),
+    (1, 1),
+    (1, -1),
+    (-1, 1),
+    (-1, -1),
+)
+# Unit directions back along each step, by step index
+_REVERSED_DIRECTIONS: tuple[Vec2, ...] = tuple(
+    Vec2(-x, -y).normalized() for x, y in _STEPS
+)
+_UNREACHED: int = -1
+
+
+class FlowField:
+    """Distances and directions toward a goal cell, over open water around it.
+
+    Cells are stored in flat lists over a square window centered on the goal,
+    with a border of closed cells, so neighbours of cells inside are never outside.
+    Each reached cell stores the step to the neighbour it was reached from,
+    so following the field is a single lookup per cell.
+    Filled by a breadth first search, that is advanced a budget of cells at a time.
+    Which cells are open is only looked up once, and is taken from the previous
+    field toward the same target, where their windows overlap.
+    """
+
+    def __init__(
+        self,
+        goal: Cell,
+        radius: int,
+        previous: FlowField | None = None,
+    ) -> None:
+        self.goal = goal
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self._stride = self.size + 2  # Including border
+        # Global location of the top left border cell
+        self._left = goal[0] - radius - 1
+        self._top = goal[1] - radius - 1
+        cell_count = self._stride * self._stride
+        self._distances = [_UNREACHED] * cell_count
+        self._steps = [_UNREACHED] * cell_count
+        # Whether each cell is open, `None` until looked up
+        self._open: list[bool | None] = [None] * cell_count
+        self._close_border()
+        if previous is not None and previous.size == self.size:
+            self._copy_open(previous)
+        self._frontier: deque[int] = deque()
+        index = self._index(goal)
+        if index is not None and self._is_open(index):
+            self._distances[index] = 0
+            self._frontier.append(index)
+
+    @property
+    def is_done(self) -> bool:
+        return not self._frontier
+
+    def _close_border(self) -> None:
+        stride = self._stride
+        opens = self._open
+        opens[:stride] = [False] * stride
+        opens[-stride:] = [False] * stride
+        for row_start in range(stride, len(opens) - stride, stride):
+            opens[row_start] = False
+            opens[row_start + stride - 1] = False
+
+    def _copy_open(self, previous: FlowField) -> None:
+        # Copy rows of cells inside both windows, as offset by the goals
+        stride = self._stride
+        shift_x = self._left - previous._left
+        shift_y = self._top - previous._top
+        first_column = max(1, 1 - shift_x)
+        stop_column = min(stride - 1, stride - 1 - shift_x)
+        if first_column >= stop_column:
+            return
+        for row in range(max(1, 1 - shift_y), min(stride - 1, stride - 1 - shift_y)):
+            start = row * stride
+            previous_start = (row + shift_y) * stride + shift_x
+            self._open[start + first_column : start + stop_column] = previous._open[
+                previous_start + first_column : previous_start + stop_column
+            ]
+
+    def _index(self, cell: Cell) -> int | None:
+        # Inside the border only
+        column = cell[0] - self._left
+        row = cell[1] - self._top
+        if 0 < column <= self.size and 0 < row <= self.size:
+            return column + row * self._stride
+        return None
+
+    def _is_open(self, index: int) -> bool:
+        is_open = self._open[index]
+        if is_open is None:
+            row, column = divmod(index, self._stride)
+            cell = (self._left + column, self._top + row)
+            # Fish only swim below the resting water level, and outside the floor
+            is_open = self._open[index] = (
+                cell[1] >= Water.REST_LEVEL and not Floor.has_point_inside(cell)
+            )
+        return is_open
+
+    def expand(self, budget: int) -> None:
+        """Reach more cells, in order of distance from the goal.
+
+        Args:
+            budget (int): most cells to visit
+        """
+        frontier = self._frontier
+        distances = self._distances
+        steps = self._steps
+        opens = self._open
+        is_open = self._is_open
+        stride = self._stride
+        while frontier and budget > 0:
+            budget -= 1
+            index = frontier.popleft()
+            distance = distances[index] + 1
+            for step_index, (step_x, step_y) in enumerate(_STEPS):
+                neighbour = index + step_x + step_y * stride
+                if distances[neighbour] != _UNREACHED:
+                    continue
+                neighbour_open = opens[neighbour]
+                if not (
+                    is_open(neighbour) if neighbour_open is None else neighbour_open
+                ):
+                    continue
+                # Don't cut corners of the floor
+                if step_x and step_y and not (
+                    is_open(index + step_x) and is_open(index + step_y * stride)
+                ):
+                    continue
+                distances[neighbour] = distance
+                steps[neighbour] = step_index  # Reversed when followed
+                frontier.append(neighbour)
+
+    def distance_at(self, x: float, y: float) -> int | None:
+        """Get distance to goal along open water, in steps.
+
+        Args:
+            x (float): global X
+            y (float): global Y
+
+        Returns:
+            int | None: steps to goal, `None` if not reached
+        """
+        index = self._index((floor(x), floor(y)))
+        if index is None or self._distances[index] == _UNREACHED:
+            return None
+        return self._distances[index]
+
+    def direction_at(self, x: float, y: float) -> Vec2 | None:
+        """Get direction of next step toward goal. Do not mutate the result.
+
+        Args:
+            x (float): global X
+            y (float): global Y
+
+        Returns:
+            Vec2 | None: shared unit direction, `Vec2.ZERO` at goal,
+                `None` if not reached
+        """
+        index = self._index((floor(x), floor(y)))
+        if index is None or self._distances[index] == _UNREACHED:
+            return None
+        step_index = self._steps[index]
+        if step_index == _UNREACHED:
+            return Vec2.ZERO
+        # Reached from the neighbour in the opposite direction of the stored step
+        return _REVERSED_DIRECTIONS[step_index]
+
+
+class FlowFields:
+    """One `FlowField` per target node, shared by everyone pursuing it.
+
+    A field is rebuilt when its target has moved more than a few cells from its goal,
+    spread over frames within a budget, while pursuers keep following the previous
+    field. Pursuers reaching the old goal are still close to the target.
+    Fields that nobody asked for since the last rebuild are not rebuilt.
+    """
+
+    _fields: ClassVar[dict[NodeID, FlowField]] = {}
+    _building: ClassVar[dict[NodeID, FlowField]] = {}
+    _targets: ClassVar[dict[NodeID, Node2D]] = {}
+    _wanted: ClassVar[set[NodeID]] = set()
+
+    @classmethod
+    def field(cls, target: Node2D) -> FlowField | None:
+        """Get field toward target, and keep it following target.
+
+        Args:
+            target (Node2D): node to pursue
+
+        Returns:
+            FlowField | None: latest complete field, `None` on first request
+        """
+        cls._wanted.add(target.uid)
+        if target.uid not in cls._targets:
+            cls._targets[target.uid] = target
+            Lifecycle.on_freed(target, cls._forget)
+        return cls._fields.get(target.uid)
+
+    @classmethod
+    def _forget(cls, target: Node) -> None:
+        cls._fields.pop(target.uid, None)
+        cls._building.pop(target.uid, None)
+        cls._targets.pop(target.uid, None)
+        cls._wanted.discard(target.uid)
+
+    @staticmethod
+    def goal_of(target: Node2D) -> Cell:
+        location = target.global_position
+        # Pursue from below when target is above water
+        return (floor(location.x), max(floor(location.y), floor(Water.REST_LEVEL)))
+
+    @classmethod
+    def update(cls) -> None:
+        _ensure_ocean()
+        if not cls._wanted:
+            return
+        budget = settings.FLOW_FIELD_BUDGET // len(cls._wanted)
+        for uid in cls._wanted:
+            building = cls._building.get(uid)
+            if building is None:
+                goal = cls.goal_of(cls._targets[uid])
+                current = cls._fields.get(uid)
+                if (
+                    current is not None
+                    and abs(goal[0] - current.goal[0]) <= settings.FLOW_FIELD_SLACK
+                    and abs(goal[1] - current.goal[1]) <= settings.FLOW_FIELD_SLACK
+                ):
+                    continue
+                building = cls._building[uid] = FlowField(
+                    goal,
+                    settings.FLOW_FIELD_RADIUS,
+                    previous=current,
+                )
+            # Finish building toward old goal, even if target moved on
+            building.expand(budget)
+            if building.is_done:
+                cls._fields[uid] = cls._building.pop(uid)
+        # Keep building fields until done, without new requests
+        cls._wanted.intersection_update(cls._building)
+
+
+def update_flow_fields(_current_scene: Scene) -> None:
+    FlowFields.update()
+
+
+# Run after `update_lod` (88), so fields follow where targets ended up this frame
+Scene.frame_tasks[86] = update_flow_fields
@@ -1,25 +1,27 @@
 import random
 from math import floor
 from copy import deepcopy
-from typing import assert_never
+from typing import TYPE_CHECKING, assert_never
 
 import colex
 from charz import (
     Camera,
+    Node,
     Sprite,
-    Scene,
-    Group,
-    ColliderComponent,
     Hitbox,
     Vec2,
     group,
 )
 
 from . import gear_types, projectiles, settings, ui, ocean
+from .collision import Collider, Colliders
 from .input_handler import InputHandler, Keyboard, Action
-from .props import Collectable, Interactable, Building, Targetable
+from .lifecycle import Lifecycle
+from .pool import Pool
+from .props import Capability, Collectable, Interactable, Building, Targetable
+from .spatial import SpatialIndex
 from .fabrication import Fabrication
-from .particles import Bubble, Blood
+from .particles import ParticleSystem, Bubble, BLOOD
 from .item import (
     ItemID,
     ItemCount,
@@ -31,6 +33,19 @@ from .item import (
 )
 from .utils import move_toward
 
+# Type checking for lazy loading
+if TYPE_CHECKING:
+    from .fish import FishSchool
+else:
+    FishSchool = None
+
+
+def _ensure_fish_school() -> None:
+    # Lazy loading - `fish` imports this module
+    global FishSchool
+    if FishSchool is None:
+        from .fish import FishSchool
+
 
 type ActionName = str
 
@@ -87,12 +102,12 @@ class PlayerDeathDrop(Interactable, Sprite):
     def update(self) -> None:
         if not self.inventory.ids() and not self._ui.is_open():
             self.queue_free()
-            Bubble().with_global_position(self.global_position)
+            Pool.acquire(Bubble).with_global_position(self.global_position)
             return
         if self._stop_submerging:
             return
 
-        bubble = Bubble().with_global_position(
+        bubble = Pool.acquire(Bubble).with_global_position(
             self.global_position + self._BUBBLE_SPAWN_OFFSET
         )
         bubble.position.x += random.randint(
@@ -100,18 +115,15 @@ class PlayerDeathDrop(Interactable, Sprite):
         )
 
         self.position.y += (1 / settings.FPS) * self._SUBMERGE_SPEED
-        if ocean.Floor.has_loose_point_inside(
+        if depth := ocean.Floor.depth_inside(
             self.global_position + self._DETECTION_OFFSET
         ):
-            while ocean.Floor.has_loose_point_inside(
-                self.global_position + self._DETECTION_OFFSET
-            ):
-                self.position += Vec2.UP
+            self.position.y -= depth
             self._stop_submerging = True
 
 
 @group("player")
-class Player(ColliderComponent, Sprite):
+class Player(Collider, Sprite):
     _GRAVITY: float = 0.91
     _MAX_SPEED: Vec2 = Vec2(2, 2)
     _JUMP_STRENGTH: float = 4
@@ -131,6 +143,7 @@ class Player(ColliderComponent, Sprite):
 
     _RANGED_REACH: float = 40
 
+    COLLIDER_MOVES = True
     input_handler: InputHandler = Keyboard()
     hitbox = Hitbox(size=Vec2(5, 3))
     z_index = 1
@@ -174,10 +187,7 @@ class Player(ColliderComponent, Sprite):
             self.hud.health_bar.MAX_VALUE,
         )
         if change < 0:  # Took damage
-            Blood().with_global_position(
-                x=self.global_position.x - 1,
-                y=self.global_position.y - 1,
-            )
+            ParticleSystem.emit(BLOOD, self.global_position - Vec2(1, 1))
 
     @property
     def damage(self) -> float:
@@ -301,17 +311,12 @@ class Player(ColliderComponent, Sprite):
 
     def is_colliding_with_ocean_floor(self) -> bool:
         center = self.global_position
+        texture_size = self.get_texture_size()
         if self.centered:
-            center -= self.get_texture_size() / 2
-        for x_offset in range(int(self.get_texture_size().x)):
-            for y_offset in range(int(self.get_texture_size().y)):
-                global_point = (
-                    floor(center.x + x_offset),
-                    floor(center.y + y_offset),
-                )
-                if global_point in ocean.Floor.points:
-                    return True
-        return False
+            center -= texture_size / 2
+        start = (floor(center.x), floor(center.y))
+        end = (start[0] + int(texture_size.x), start[1] + int(texture_size.y))
+        return ocean.Floor.overlaps_rect(start, end)
 
     def handle_gui(self) -> None:
         if not isinstance(self._current_interactable, Fabrication):
@@ -362,12 +367,12 @@ class Player(ColliderComponent, Sprite):
         # NOTE: Order of x/y matter
         self.position.y += combined_velocity.y
         # Revert motion if ended up colliding
-        if self.is_colliding_with_ocean_floor() or self.is_colliding():
+        if self.is_colliding_with_ocean_floor() or Colliders.is_colliding(self):
             self.position.y -= combined_velocity.y
             self._y_speed = 0  # Hit ocean floor
         self.position.x += combined_velocity.x
         # Revert motion if ended up colliding
-        if self.is_colliding_with_ocean_floor() or self.is_colliding():
+        if self.is_colliding_with_ocean_floor() or Colliders.is_colliding(self):
             self.position.x -= combined_velocity.x
         # Apply friction
         friction = self._WATER_FRICTION if self.is_submerged() else self._AIR_FRICTION
@@ -402,7 +407,7 @@ class Player(ColliderComponent, Sprite):
         rate *= 1 - self._diving_mask.value
         self.hud.oxygen_bar.value -= rate
         if self.hud.oxygen_bar.cell_count < oxygen_bubble_count:
-            Bubble().with_global_position(
+            Pool.acquire(Bubble).with_global_position(
                 x=self.global_position.x,
                 y=self.global_position.y - 1,
             )
@@ -420,10 +425,15 @@ class Player(ColliderComponent, Sprite):
     def handle_interact_selection(self) -> None:
         proximite_interactables: list[tuple[float, Interactable]] = []
         global_point = self.global_position  # Store property value outside loop
-        for node in Scene.current.get_group_members(Group.TEXTURE, type_hint=Sprite):
+        interactables = SpatialIndex.grid(Capability.INTERACTABLE)
+        for _distance, node in interactables.query_radius(
+            global_point.x,
+            global_point.y,
+            Interactable.max_reach,
+        ):
+            assert isinstance(node, Interactable)
             if (
-                isinstance(node, Interactable)
-                and node.interactable
+                node.interactable
                 and (condition_and_dist := node.is_in_range_of(global_point))[0]
             ):  # I know this syntax might be a bit too much,
                 # but know that it made it easier to split logic into mixin class
@@ -444,6 +454,7 @@ class Player(ColliderComponent, Sprite):
                 Sprite,
             ), f"{first.__class__} is missing `Sprite` base"
             self._current_interactable = first
+            Lifecycle.on_freed(first, self._on_focus_freed)
             self._current_interactable.grab_focus()
             self._current_interactable.when_selected(self)
         # Or unselect last interactable that *was* in reach
@@ -466,16 +477,14 @@ class Player(ColliderComponent, Sprite):
     def handle_target_selection(self) -> None:
         proximite_targetables: list[tuple[float, Targetable]] = []
         global_point = self.global_position  # Store property value outside loop
-        reach_squared = self._RANGED_REACH * self._RANGED_REACH
-        # TODO: Iterate over a smaller collection
-        for node in Scene.current.get_group_members(Group.TEXTURE, type_hint=Sprite):
-            if (
-                isinstance(node, Targetable)
-                and (distance := global_point.distance_squared_to(node.global_position))
-                < reach_squared
-            ):  # I know this syntax might be a bit too much,
-                # but know that it made it easier to split logic into mixin class
-                proximite_targetables.append((distance, node))
+        targetables = SpatialIndex.grid(Capability.TARGETABLE)
+        for distance, node in targetables.query_radius(
+            global_point.x,
+            global_point.y,
+            self._RANGED_REACH,
+        ):
+            assert isinstance(node, Targetable)
+            proximite_targetables.append((distance, node))
 
         # Highlight closest interactable - Using DSU
         if proximite_targetables:
@@ -491,6 +500,7 @@ class Player(ColliderComponent, Sprite):
                 Sprite,
             ), f"{first.__class__} is missing `Sprite` base"
             self._current_targetable = first
+            Lifecycle.on_freed(first, self._on_focus_freed)
             # TODO: Do Harpoon aiming here, and fire if key pressed
             if (
                 self.input_handler.is_action_just_pressed(Action.THROW_HARPOON)
@@ -498,9 +508,10 @@ class Player(ColliderComponent, Sprite):
             ):
                 harpoon_info = gear[self._harpoon.model]
                 damage = harpoon_info[1]
+                _ensure_fish_school()
                 projectiles.HarpoonSpear(
                     position=self.global_position,
-                ).with_target(first).with_damage(damage)
+                ).launch(FishSchool.location_of(first), damage)
             # self._current_targetable.grab_focus()
             # self._current_targetable.when_selected(self)
         # Or unselect last interactable that *was* in reach
@@ -518,6 +529,12 @@ class Player(ColliderComponent, Sprite):
             # TODO: Check for z_index change, so that it respects z_index change in on_interact
             self._current_targetable.gain_target()
 
+    def _on_focus_freed(self, node: Node) -> None:
+        if node is self._current_interactable:
+            self._current_interactable = None
+        if node is self._current_targetable:
+            self._current_targetable = None
+
     def handle_collect(self) -> None:
         if self._current_interactable is None:
             return
@@ -574,7 +591,8 @@ class Player(ColliderComponent, Sprite):
 
         # TP back to surface air
         self.global_position = Vec2(20 + random.randint(0, 20), -20)
-        while self.is_colliding():  # Avoid colliding with player in air at respawn
+        # Avoid colliding with player in air at respawn
+        while Colliders.is_colliding(self):
             self.global_position = Vec2(20 + random.randint(0, 20), -20)
 
         # Hide inventory UI instantly
@@ -582,7 +600,7 @@ class Player(ColliderComponent, Sprite):
         self.hud.inventory.hide()
 
         # Release current interactable focus
-        self.parent = None  # Just in case, temp anyways...
+        Lifecycle.reparent(self, None)  # Just in case, temp anyways...
         if isinstance(self._current_interactable, Interactable):
             self._current_interactable.loose_focus()
 
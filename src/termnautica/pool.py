@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, ClassVar
+
+from charz import Scene, Node
+from charz_core.typing import GroupID
+
+from .lifecycle import Lifecycle
+
+
+class Pooled:
+    """Mixin for nodes that `Pool` may recycle, instead of constructing new ones.
+
+    A recycled node keeps its `uid`, and has `reset` called instead of `__init__`.
+    """
+
+    pool_generation: int = 0  # Bumped each time recycled, to invalidate old timers
+
+    def reset(self) -> None:
+        """Reset state, when recycled from pool. Override in subclass."""
+
+
+class Pool:
+    """Free lists of freed `Pooled` nodes, per type.
+
+    When a pooled node is freed, the groups it was in are recorded,
+    so that it can be put back into the same groups when acquired again.
+    """
+
+    MAX_FREE_PER_TYPE: ClassVar[int] = 256
+    _free: ClassVar[dict[type[Any], list[tuple[Pooled, list[GroupID]]]]] = {}
+
+    @classmethod
+    def acquire[T: Node](cls, kind: type[T]) -> T:
+        """Get a recycled node of type, or construct a new one.
+
+        Args:
+            kind (type[T]): node type, not pooled unless subclass of `Pooled`
+
+        Returns:
+            T: ready node, either new or reset
+        """
+        if not issubclass(kind, Pooled):
+            return kind()
+        free = cls._free.get(kind)
+        if free:
+            node, group_ids = free.pop()
+            assert isinstance(node, kind)
+            groups = Scene.current.groups
+            for group_id in group_ids:
+                groups[group_id][node.uid] = node
+            node.reset()
+        else:
+            node = kind()
+        Lifecycle.on_freed(node, cls._release)
+        return node
+
+    @classmethod
+    def _release(cls, node: Node) -> None:
+        assert isinstance(node, Pooled)
+        free = cls._free.setdefault(node.__class__, [])
+        if len(free) >= cls.MAX_FREE_PER_TYPE:
+            return
+        node.pool_generation += 1
+        # Still in groups, since listeners are called before freeing
+        group_ids = [
+            group_id
+            for group_id, members in Scene.current.groups.items()
+            if node.uid in members
+        ]
+        free.append((node, group_ids))
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._free.clear()
@@ -1,57 +1,313 @@
-from typing import Self
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import ceil
+from typing import TYPE_CHECKING, ClassVar, Self
 
 import colex
-from charz import Scene, Group, Sprite
+from charz import Scene, Group, Sprite, ColliderComponent, Vec2
 
-from .props import Targetable, HasHealth
+from .flyweight import Flyweight
+from .props import Capability, HasHealth
+from .spatial import SpatialIndex
 
+# Type checking for lazy loading
+if TYPE_CHECKING:
+    from .ocean import Water, Floor
+    from .fish import FishSchool
+else:
+    Water = Floor = FishSchool = None
 
-class HarpoonSpear(Sprite):
-    _MARGIN: float = 3
-    _SPEED: float = 3  # Per frame
-    _target: Targetable | None = None
-    _damage: float | None = None
-    color = colex.AZURE
-    texture = ["====!"]
 
-    def with_target(self, target: Sprite | None, /) -> Self:
-        assert isinstance(target, Targetable)
-        self._target = target
-        return self
+def _ensure_ocean() -> None:
+    # Lazy loading - A quick workaround
+    global Water, Floor
+    if Water is None:
+        from .ocean import Water, Floor
+
+
+def _ensure_fish_school() -> None:
+    # Lazy loading - `fish` imports `player`, that imports this module
+    global FishSchool
+    if FishSchool is None:
+        from .fish import FishSchool
+
+
+type Rect = tuple[float, float, float, float]  # Left, top, right, bottom
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class Ballistics:
+    speed: float  # Launch speed, per frame
+    gravity: float = 0  # Added to Y-speed each frame
+    air_drag: float = 0  # Fraction of speed lost each frame, above water
+    water_drag: float = 0  # Fraction of speed lost each frame, under water
+    lifetime: int = 60  # Frames
+    reach: float = 8  # Largest half size of anything hit, used for broadphase
+
+
+def hit_rect(node: Sprite) -> Rect:
+    """Get global rectangle that can be hit, from hitbox or else texture.
+
+    Args:
+        node (Sprite): node to get rectangle of
+
+    Returns:
+        Rect: left, top, right and bottom, in global space
+    """
+    _ensure_fish_school()
+    # Sprites of fish lag behind, unless drawn this frame
+    location = FishSchool.location_of(node)
+    if isinstance(node, ColliderComponent) and not node.hitbox.disabled:
+        size = node.hitbox.size
+        centered = node.hitbox.centered
+    else:
+        size = node.get_texture_size()
+        centered = node.centered
+    left = location.x - size.x / 2 if centered else location.x
+    top = location.y - size.y / 2 if centered else location.y
+    return (left, top, left + size.x, top + size.y)
+
+
+def segment_enters_rect(
+    x: float,
+    y: float,
+    delta_x: float,
+    delta_y: float,
+    rect: Rect,
+) -> float | None:
+    """Find where segment enters rectangle, using the slab method.
+
+    Args:
+        x (float): start X
+        y (float): start Y
+        delta_x (float): change in X, along segment
+        delta_y (float): change in Y, along segment
+        rect (Rect): rectangle to test against
+
+    Returns:
+        float | None: fraction of segment at entry, `None` if segment misses
+    """
+    enter = 0.0
+    leave = 1.0
+    for start, delta, low, high in (
+        (x, delta_x, rect[0], rect[2]),
+        (y, delta_y, rect[1], rect[3]),
+    ):
+        if delta == 0:
+            if not low <= start <= high:
+                return None
+            continue
+        near = (low - start) / delta
+        far = (high - start) / delta
+        if near > far:
+            near, far = far, near
+        enter = max(enter, near)
+        leave = min(leave, far)
+        if enter > leave:
+            return None
+    return enter
+
+
+def segment_enters_floor(
+    x: float,
+    y: float,
+    delta_x: float,
+    delta_y: float,
+) -> float | None:
+    """Find where segment enters the floor, stepping less than 1 cell at a time.
+
+    Args:
+        x (float): start X
+        y (float): start Y
+        delta_x (float): change in X, along segment
+        delta_y (float): change in Y, along segment
+
+    Returns:
+        float | None: fraction of segment at entry, `None` if segment stays outside
+    """
+    _ensure_ocean()
+    steps = ceil(max(abs(delta_x), abs(delta_y))) + 1
+    for step in range(1, steps + 1):
+        fraction = step / steps
+        point = (int(x + delta_x * fraction), int(y + delta_y * fraction))
+        if Floor.has_point_inside(point):
+            return fraction
+    return None
 
-    def with_damage(self, damage: float | None, /) -> Self:
-        self._damage = damage
+
+class Projectile(Sprite):
+    """Projectile flown by `Projectiles`, that damages the first `HasHealth` it hits."""
+
+    BALLISTICS: ClassVar[Ballistics]
+    _AIM_ITERATIONS: ClassVar[int] = 3
+    damage: float = 0
+
+    def launch(self, target_location: Vec2, damage: float) -> Self:
+        """Fly toward target location, aiming to make up for gravity and drag.
+
+        Args:
+            target_location (Vec2): global location to aim for
+            damage (float): damage dealt on hit
+
+        Returns:
+            Self: same projectile, now in flight
+        """
+        self.damage = damage
+        location = self.global_position
+        speed = self.BALLISTICS.speed
+        aim = target_location.copy()
+        # Move aim by how much a test flight misses, a few times
+        for _ in range(self._AIM_ITERATIONS):
+            miss = self._miss(location, location.direction_to(aim), target_location)
+            if miss is None:
+                break
+            aim -= miss
+        Projectiles.add(self, location.direction_to(aim) * speed)
         return self
 
-    def update(self) -> None:
-        assert isinstance(self._target, Sprite), (
-            f"Target {self._target} missing `Sprite` base"
-        )
-        assert isinstance(self._damage, (float, int)), (
-            "Damage is not set. Use `.with_damage(...)`"
+    def _miss(self, start: Vec2, direction: Vec2, target: Vec2) -> Vec2 | None:
+        # Fly without collision, using drag of medium at start
+        _ensure_ocean()
+        ballistics = self.BALLISTICS
+        drag = (
+            ballistics.water_drag
+            if start.y > Water.wave_height_at(start.x)
+            else ballistics.air_drag
         )
+        distance = start.distance_to(target)
+        velocity = direction * ballistics.speed
+        location = start.copy()
+        for _ in range(ballistics.lifetime):
+            velocity.y += ballistics.gravity
+            velocity *= 1 - drag
+            location += velocity
+            if (location - start).dot(direction) >= distance:
+                return location - target
+        return None  # Does not reach
 
-        # Check if target is still in world
-        if self._target.uid not in Scene.current.groups[Group.NODE]:
-            self.queue_free()
-            return
+    def on_hit(self, node: HasHealth) -> None:
+        node.health -= self.damage
+        self.queue_free()
 
-        # TODO: ADD GRAVITY
-        direction = self.global_position.direction_to(self._target.global_position)
-        distance = self.global_position.distance_to(self._target.global_position)
-        move_distance = min(self._SPEED, distance)
-        self.global_position += direction * move_distance
+    def on_hit_floor(self) -> None:
+        self.queue_free()
 
-        location = self.global_position
-        margin_squared = self._MARGIN * self._MARGIN
-        for node in Scene.current.get_group_members(Group.TEXTURE, type_hint=Sprite):
-            if node is self:
+
+class HarpoonSpear(Projectile):
+    BALLISTICS = Ballistics(
+        speed=3,
+        gravity=0.06,
+        air_drag=0.01,
+        water_drag=0.04,
+        lifetime=40,
+    )
+    color = colex.AZURE
+    texture = ["====!"]
+    centered = True
+
+
+class Projectiles:
+    """All projectiles in flight, stored as parallel lists.
+
+    Projectiles are integrated in 1 batched step per frame, and their path
+    in that frame is swept against the floor and the hit rectangles
+    of `HasHealth` nodes, so fast projectiles can not pass through anything.
+    Nodes to test are picked from the spatial grid, in the box around the path.
+    """
+
+    _nodes: ClassVar[list[Projectile]] = []
+    _velocity_x: ClassVar[list[float]] = []
+    _velocity_y: ClassVar[list[float]] = []
+    _frames_left: ClassVar[list[int]] = []
+
+    @classmethod
+    def add(cls, projectile: Projectile, velocity: Vec2) -> None:
+        cls._nodes.append(projectile)
+        cls._velocity_x.append(velocity.x)
+        cls._velocity_y.append(velocity.y)
+        cls._frames_left.append(projectile.BALLISTICS.lifetime)
+        cls._face(projectile, velocity.x)
+
+    @staticmethod
+    def _face(projectile: Projectile, velocity_x: float) -> None:
+        # Textures point right
+        if velocity_x < 0:
+            projectile.texture = Flyweight.flipped_h(projectile.__class__.texture)
+        else:
+            projectile.texture = projectile.__class__.texture
+
+    @classmethod
+    def step(cls) -> None:
+        _ensure_ocean()
+        nodes = Scene.current.groups[Group.NODE]
+        targets = SpatialIndex.grid(Capability.HAS_HEALTH)
+        kept: list[int] = []
+        for index, projectile in enumerate(cls._nodes):
+            if projectile.uid not in nodes:
                 continue
-            # DEV
-            if node.__class__.__name__ == "Player":
+            ballistics = projectile.BALLISTICS
+            location = projectile.global_position
+            x = location.x
+            y = location.y
+            # Integrate speed, with drag picked by medium
+            drag = (
+                ballistics.water_drag
+                if y > Water.wave_height_at(x)
+                else ballistics.air_drag
+            )
+            velocity_x = cls._velocity_x[index] * (1 - drag)
+            velocity_y = (cls._velocity_y[index] + ballistics.gravity) * (1 - drag)
+            # Sweep path of this frame, and stop at what it enters first
+            reach = ballistics.reach
+            candidates = targets.query_aabb(
+                min(x, x + velocity_x) - reach,
+                min(y, y + velocity_y) - reach,
+                max(x, x + velocity_x) + reach,
+                max(y, y + velocity_y) + reach,
+            )
+            first_hit: HasHealth | None = None
+            first_fraction = segment_enters_floor(x, y, velocity_x, velocity_y)
+            for candidate in candidates:
+                assert isinstance(candidate, HasHealth)
+                assert isinstance(candidate, Sprite)
+                fraction = segment_enters_rect(
+                    x, y, velocity_x, velocity_y, hit_rect(candidate)
+                )
+                if fraction is not None and (
+                    first_fraction is None or fraction < first_fraction
+                ):
+                    first_hit = candidate
+                    first_fraction = fraction
+            if first_fraction is not None:
+                projectile.global_position = Vec2(
+                    x + velocity_x * first_fraction,
+                    y + velocity_y * first_fraction,
+                )
+                if first_hit is not None:
+                    projectile.on_hit(first_hit)
+                else:
+                    projectile.on_hit_floor()
                 continue
-            if not isinstance(node, HasHealth):
+            projectile.global_position = Vec2(x + velocity_x, y + velocity_y)
+            cls._frames_left[index] -= 1
+            if cls._frames_left[index] <= 0:
+                projectile.queue_free()
                 continue
-            if location.distance_squared_to(node.global_position) < margin_squared:
-                node.health -= self._damage
-                self.queue_free()
+            if (velocity_x < 0) != (cls._velocity_x[index] < 0):
+                cls._face(projectile, velocity_x)
+            cls._velocity_x[index] = velocity_x
+            cls._velocity_y[index] = velocity_y
+            kept.append(index)
+        cls._nodes[:] = [cls._nodes[index] for index in kept]
+        cls._velocity_x[:] = [cls._velocity_x[index] for index in kept]
+        cls._velocity_y[:] = [cls._velocity_y[index] for index in kept]
+        cls._frames_left[:] = [cls._frames_left[index] for index in kept]
+
+
+def update_projectiles(_current_scene: Scene) -> None:
+    Projectiles.step()
+
+
+# Run after `update_nodes` (90), so hits are tested against this frame's locations
+Scene.frame_tasks[89] = update_projectiles
@@ -5,7 +5,8 @@ Classes defined here will be used as `mixin components`.
 They may also provide methods, either to be overwritten, or as base case.
 """
 
-from typing import Self
+from enum import StrEnum, auto
+from typing import Any, ClassVar, Self
 
 import pygame
 import colex
@@ -13,6 +14,53 @@ from charz import Sprite, Hitbox, Vec2, clamp
 
 from . import settings
 from .item import ItemID, Recipe, Container
+from .flyweight import Flyweight
+from .spatial import SpatialIndex
+
+
+class Capability(StrEnum):
+    """IDs of spatial grids, with all live instances of a mixin."""
+
+    INTERACTABLE = auto()
+    TARGETABLE = auto()
+    HAS_HEALTH = auto()
+
+
+SpatialIndex.index_group(Capability.INTERACTABLE)
+SpatialIndex.index_group(Capability.TARGETABLE)
+SpatialIndex.index_group(Capability.HAS_HEALTH)
+
+
+class Capable:
+    """Base of mixins that register instances in their `Capability` spatial grid.
+
+    Instances are removed from grids when freed, and tracked again
+    with `track_spatial` when recycled from `Pool`.
+    """
+
+    _CAPABILITY: ClassVar[Capability | None] = None
+    # Set to `False` if never moved, or if the owner of the node
+    # moves it with `SpatialIndex.move`, like `FishSchool` does
+    SPATIAL_MOVES: ClassVar[bool] = True
+    capabilities: ClassVar[tuple[Capability, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.capabilities = tuple(
+            capability
+            for base in reversed(cls.__mro__)
+            if (capability := base.__dict__.get("_CAPABILITY")) is not None
+        )
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        instance = super().__new__(cls, *args, **kwargs)
+        instance.track_spatial()
+        return instance
+
+    def track_spatial(self) -> None:
+        """Index in spatial grids. Call again when recycled from `Pool`."""
+        assert isinstance(self, Sprite), f"`Sprite` base missing for {self}"
+        SpatialIndex.track(self, self.capabilities, moves=self.SPATIAL_MOVES)
 
 
 class Collectable:
@@ -30,13 +78,21 @@ class Collectable:
             self._SOUND_COLLECT.play()
 
 
-class Interactable:
+class Interactable(Capable):
+    _CAPABILITY = Capability.INTERACTABLE
     _REACH: float = 8  # Maximum length the interactor can be from the `Interactable`
     _REACH_FRACTION: float = 2 / 3  # Y-axis fraction, in linear transformation
     _REACH_CENTER: Vec2 = Vec2.ZERO  # Offset
     _HIGHLIGHT_Z_INDEX: int | None = None
     interactable: bool = True  # Turn off when in use
     _last_z_index: int | None = None
+    # Largest reach of any subclass, measured from node location
+    max_reach: ClassVar[float] = _REACH
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        reach = cls._REACH * max(1, cls._REACH_FRACTION) + cls._REACH_CENTER.length()
+        Interactable.max_reach = max(Interactable.max_reach, reach)
 
     def with_interacting(self, state: bool, /) -> Self:
         self.interactable = state
@@ -44,7 +100,7 @@ class Interactable:
 
     def grab_focus(self) -> None:
         assert isinstance(self, Sprite)
-        self.color = colex.REVERSE + (self.__class__.color or colex.WHITE)
+        self.color = Flyweight.highlighted(self.__class__.color)
         if self._HIGHLIGHT_Z_INDEX is not None and self._last_z_index is None:
             self._last_z_index = self.z_index
             self.z_index = self._HIGHLIGHT_Z_INDEX
@@ -167,7 +223,8 @@ class _Marker(Sprite):
     ]
 
 
-class Targetable:
+class Targetable(Capable):
+    _CAPABILITY = Capability.TARGETABLE
     _marker: Sprite | None = None
 
     def gain_target(self) -> None:
@@ -183,7 +240,8 @@ class Targetable:
             self._marker.hide()
 
 
-class HasHealth:  # Health property might be overridden in subclass
+class HasHealth(Capable):  # Health property might be overridden in subclass
+    _CAPABILITY = Capability.HAS_HEALTH
     _health: float
 
     @property
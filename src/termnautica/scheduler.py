@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import ceil
+from typing import Callable, ClassVar
+
+from charz import Scene, Group, Node
+
+
+type Callback = Callable[[], None]
+
+
+@dataclass(slots=True, eq=False)
+class Timer:
+    frame: int  # Frame to fire at
+    callback: Callback
+    owner: Node | None = None  # Skipped if freed before firing
+    generation: int = 0  # `pool_generation` of owner, skipped if recycled since
+    cancelled: bool = field(default=False, init=False)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Hierarchical timer wheel, keyed on frame number.
+
+    Level `n` has `SLOTS` slots, each covering `SLOTS ** n` frames.
+    Timers are placed in the lowest level that can reach them,
+    and moved down a level when the frame enters their slot.
+    Advancing 1 frame only touches the timers that fire, plus the occasional cascade.
+    """
+
+    _SLOT_BITS: int = 6
+    _SLOTS: int = 1 << _SLOT_BITS
+    _SLOT_MASK: int = _SLOTS - 1
+    _LEVELS: int = 4
+
+    def __init__(self) -> None:
+        self.frame = 0
+        self._levels: list[list[list[Timer]]] = [
+            [[] for _ in range(self._SLOTS)] for _ in range(self._LEVELS)
+        ]
+        self._overflow: list[Timer] = []  # Beyond reach of top level
+
+    def schedule(self, timer: Timer) -> None:
+        delta = timer.frame - self.frame
+        for level, slots in enumerate(self._levels):
+            shift = self._SLOT_BITS * level
+            if delta < 1 << (shift + self._SLOT_BITS):
+                slots[(timer.frame >> shift) & self._SLOT_MASK].append(timer)
+                return
+        self._overflow.append(timer)
+
+    def advance(self) -> list[Timer]:
+        """Step to next frame.
+
+        Returns:
+            list[Timer]: timers due this frame, including cancelled ones
+        """
+        self.frame += 1
+        # Cascade higher levels first, so timers can fall all the way down
+        for level in range(self._LEVELS, 0, -1):
+            shift = self._SLOT_BITS * level
+            if self.frame & ((1 << shift) - 1):
+                continue
+            if level == self._LEVELS:
+                moved = self._overflow
+                self._overflow = []
+            else:
+                slots = self._levels[level]
+                index = (self.frame >> shift) & self._SLOT_MASK
+                moved = slots[index]
+                slots[index] = []
+            for timer in moved:
+                self.schedule(timer)
+        slots = self._levels[0]
+        index = self.frame & self._SLOT_MASK
+        due = slots[index]
+        slots[index] = []
+        return due
+
+
+class Scheduler:
+    """Frame based scheduler, so nodes don't have to count down in `update`.
+
+    Timers fire before nodes are updated, on the frame they are due.
+    """
+
+    _wheel: ClassVar[TimerWheel] = TimerWheel()
+
+    @classmethod
+    def frame(cls) -> int:
+        return cls._wheel.frame
+
+    @classmethod
+    def call_in(
+        cls,
+        frames: float,
+        callback: Callback,
+        *,
+        owner: Node | None = None,
+    ) -> Timer:
+        """Call `callback` after a number of frames.
+
+        Args:
+            frames (float): frames to wait, rounded up, and at least 1
+            callback (Callback): function to call
+            owner (Node | None, optional): node the timer belongs to. Defaults to None.
+
+        Returns:
+            Timer: handle that can be cancelled
+        """
+        timer = Timer(
+            frame=cls._wheel.frame + max(1, ceil(frames)),
+            callback=callback,
+            owner=owner,
+            generation=getattr(owner, "pool_generation", 0),
+        )
+        cls._wheel.schedule(timer)
+        return timer
+
+    @classmethod
+    def frames_until(cls, timer: Timer) -> int:
+        return timer.frame - cls._wheel.frame
+
+
+def fire_timers(current_scene: Scene) -> None:
+    """Fire timers due this frame, skipping those cancelled or owned by freed nodes.
+
+    Timers of pooled nodes are also skipped, if the owner has been recycled since.
+    """
+    nodes = current_scene.groups[Group.NODE]
+    for timer in Scheduler._wheel.advance():
+        if timer.cancelled:
+            continue
+        owner = timer.owner
+        if owner is not None and (
+            owner.uid not in nodes
+            or timer.generation != getattr(owner, "pool_generation", 0)
+        ):
+            continue
+        timer.callback()
+
+
+# Run after `update_self_scene` (100), before `update_nodes` (90)
+Scene.frame_tasks[95] = fire_timers
@@ -2,7 +2,23 @@ from pathlib import Path as _Path
 
 
 FPS: float = 16
-WORLD_WIDTH: int = 500 + 500
+CHUNK_WIDTH: int = 64  # Columns per world chunk
+CHUNK_LOAD_DISTANCE: int = 2  # Chunks loaded on each side of a player
+CHUNK_EVICT_DISTANCE: int = 4  # Chunks further away than this are freed
+SPAWNER_ACTIVE_RADIUS: float = 100  # Spawners closer to a player are resumed
+SPAWNER_DORMANT_RADIUS: float = 120  # Spawners further from all players are suspended
+SPAWNER_ACTIVITY_CHECK_INTERVAL: int = 8  # Frames
+LOD_VIEW_MARGIN: float = 8  # Entities this close to a camera view update every frame
+LOD_NEARBY_DISTANCE: float = 100  # Further from the view center, only timers advance
+LOD_NEARBY_INTERVAL: int = 4  # Frames between updates of nearby entities
+LOD_CHECK_INTERVAL: int = 8  # Frames between picking tiers
+SPATIAL_CELL_SIZE: int = 16  # Width and height of spatial grid cells
+FLOW_FIELD_RADIUS: int = 32  # Cells around pursued targets, in each direction
+FLOW_FIELD_BUDGET: int = 1500  # Cells visited per frame, shared by all flow fields
+FLOW_FIELD_SLACK: int = 2  # Cells a target moves before its flow field is rebuilt
+DIFF_OUTPUT: bool = True  # Only write cells that changed since last frame
+THREADED_OUTPUT: bool = True  # Write frames from a background thread
+COLOR_DEPTH: str = "truecolor"  # One of "truecolor", "256", "16" or "mono"
 SAVE_FOLDER = _Path(__file__).parent / "saves"
 ASSETS_FOLDER = _Path(__file__).parent.joinpath("assets")
 SPRITES_FOLDER = ASSETS_FOLDER / "sprites"
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from math import floor
+from typing import ClassVar
+
+from charz import Scene, Group, Node, Node2D
+from charz_core.typing import NodeID, GroupID
+
+from . import settings
+from .lifecycle import Lifecycle
+
+
+type Cell = tuple[int, int]
+
+
+class SpatialGrid:
+    """Uniform grid over nodes, bucketed by the cell of their global location.
+
+    Nodes are only moved between buckets when they cross into another cell,
+    and queries only visit the cells that overlap the queried area.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size = cell_size
+        self._cells: dict[Cell, dict[NodeID, Node]] = {}
+        self._entries: dict[NodeID, tuple[Cell, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, node: Node) -> bool:
+        return node.uid in self._entries
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._entries.clear()
+
+    def move(self, node: Node, x: float, y: float) -> None:
+        """Set location of node, adding it if not in the grid.
+
+        Args:
+            node (Node): node to move
+            x (float): global X
+            y (float): global Y
+        """
+        cell = (floor(x) // self.cell_size, floor(y) // self.cell_size)
+        entry = self._entries.get(node.uid)
+        if entry is None or entry[0] != cell:
+            if entry is not None:
+                self._discard(node.uid, entry[0])
+            self._cells.setdefault(cell, {})[node.uid] = node
+        self._entries[node.uid] = (cell, x, y)
+
+    def remove(self, node: Node) -> None:
+        entry = self._entries.pop(node.uid, None)
+        if entry is not None:
+            self._discard(node.uid, entry[0])
+
+    def _discard(self, uid: NodeID, cell: Cell) -> None:
+        bucket = self._cells[cell]
+        del bucket[uid]
+        if not bucket:
+            del self._cells[cell]
+
+    def location(self, node: Node) -> tuple[float, float] | None:
+        entry = self._entries.get(node.uid)
+        if entry is None:
+            return None
+        return (entry[1], entry[2])
+
+    def query_aabb(
+        self,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+    ) -> list[Node]:
+        """Find nodes located inside axis aligned box, borders included.
+
+        Args:
+            left (float): smallest global X
+            top (float): smallest global Y
+            right (float): largest global X
+            bottom (float): largest global Y
+
+        Returns:
+            list[Node]: nodes inside box, in no particular order
+        """
+        size = self.cell_size
+        entries = self._entries
+        found: list[Node] = []
+        for cell_x in range(floor(left) // size, floor(right) // size + 1):
+            for cell_y in range(floor(top) // size, floor(bottom) // size + 1):
+                bucket = self._cells.get((cell_x, cell_y))
+                if bucket is None:
+                    continue
+                for uid, node in bucket.items():
+                    _cell, x, y = entries[uid]
+                    if left <= x <= right and top <= y <= bottom:
+                        found.append(node)
+        return found
+
+    def query_radius(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+    ) -> list[tuple[float, Node]]:
+        """Find nodes located within radius of point.
+
+        Args:
+            x (float): global X
+            y (float): global Y
+            radius (float): largest distance, included
+
+        Returns:
+            list[tuple[float, Node]]: squared distance and node, in no particular order
+        """
+        size = self.cell_size
+        entries = self._entries
+        radius_squared = radius * radius
+        found: list[tuple[float, Node]] = []
+        for cell_x in range(floor(x - radius) // size, floor(x + radius) // size + 1):
+            for cell_y in range(
+                floor(y - radius) // size, floor(y + radius) // size + 1
+            ):
+                bucket = self._cells.get((cell_x, cell_y))
+                if bucket is None:
+                    continue
+                for uid, node in bucket.items():
+                    _cell, node_x, node_y = entries[uid]
+                    distance_squared = (node_x - x) ** 2 + (node_y - y) ** 2
+                    if distance_squared <= radius_squared:
+                        found.append((distance_squared, node))
+        return found
+
+    def nearest[T](
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        kind: type[T],
+    ) -> T | None:
+        """Find nearest node of type, within radius of point.
+
+        Args:
+            x (float): global X
+            y (float): global Y
+            radius (float): largest distance, included
+            kind (type[T]): type to look for
+
+        Returns:
+            T | None: nearest match, or `None` if no match in range
+        """
+        best: T | None = None
+        best_distance_squared = float("inf")
+        for distance_squared, node in self.query_radius(x, y, radius):
+            if isinstance(node, kind) and distance_squared < best_distance_squared:
+                best = node
+                best_distance_squared = distance_squared
+        return best
+
+
+class SpatialIndex:
+    """Spatial grids per group, used for proximity queries.
+
+    Nodes are added to the grids of the indexed groups they are tracked with,
+    on the frame after being tracked, and removed when freed.
+    Only nodes that move are refreshed each frame.
+    """
+
+    _grids: ClassVar[dict[GroupID, SpatialGrid]] = {}
+    _pending: ClassVar[list[tuple[Node2D, tuple[GroupID, ...], bool]]] = []
+    _node_grids: ClassVar[dict[NodeID, list[SpatialGrid]]] = {}
+    _movers: ClassVar[dict[NodeID, Node2D]] = {}
+
+    @classmethod
+    def index_group(cls, group_id: GroupID) -> SpatialGrid:
+        """Create grid for members of group, that are tracked.
+
+        Args:
+            group_id (GroupID): group to index
+
+        Returns:
+            SpatialGrid: new grid
+        """
+        grid = cls._grids[group_id] = SpatialGrid(settings.SPATIAL_CELL_SIZE)
+        return grid
+
+    @classmethod
+    def grid(cls, group_id: GroupID) -> SpatialGrid:
+        return cls._grids[group_id]
+
+    @classmethod
+    def track(
+        cls,
+        node: Node2D,
+        group_ids: tuple[GroupID, ...],
+        *,
+        moves: bool = True,
+    ) -> None:
+        """Add node to grids on next refresh. Call again when recycled from `Pool`.
+
+        Args:
+            node (Node2D): new or recycled node
+            group_ids (tuple[GroupID, ...]): groups of node, that may be indexed
+            moves (bool, optional): refresh location each frame. Defaults to True.
+        """
+        cls._pending.append((node, group_ids, moves))
+
+    @classmethod
+    def move(cls, node: Node, x: float, y: float) -> None:
+        """Move node in its grids, for owners that move nodes in batch."""
+        for grid in cls._node_grids.get(node.uid, ()):
+            grid.move(node, x, y)
+
+    @classmethod
+    def _untrack(cls, node: Node) -> None:
+        for grid in cls._node_grids.pop(node.uid, ()):
+            grid.remove(node)
+        cls._movers.pop(node.uid, None)
+
+
+def update_spatial_index(current_scene: Scene) -> None:
+    """Add tracked nodes to grids, and refresh the location of those that move."""
+    if SpatialIndex._pending:
+        nodes = current_scene.groups[Group.NODE]
+        for node, group_ids, moves in SpatialIndex._pending:
+            if node.uid not in nodes:  # Freed before it was added
+                continue
+            grids = [
+                SpatialIndex._grids[group_id]
+                for group_id in group_ids
+                if group_id in SpatialIndex._grids
+            ]
+            if not grids:
+                continue
+            SpatialIndex._node_grids[node.uid] = grids
+            location = node.global_position
+            for grid in grids:
+                grid.move(node, location.x, location.y)
+            Lifecycle.on_freed(node, SpatialIndex._untrack)
+            if moves:
+                SpatialIndex._movers[node.uid] = node
+        SpatialIndex._pending.clear()
+    for node in SpatialIndex._movers.values():
+        location = node.global_position
+        for grid in SpatialIndex._node_grids[node.uid]:
+            grid.move(node, location.x, location.y)
+
+
+# Run before `update_nodes` (90), so queries see locations from end of last frame
+Scene.frame_tasks[92] = update_spatial_index
@@ -4,11 +4,14 @@ from types import UnionType, get_original_bases
 from typing import Any, Self, get_origin, get_args, assert_never
 
 import colex
-from charz import Scene, Group, Sprite, Vec2, group
+from charz import Scene, Node, Node2D, Sprite, Vec2, group
 
 from . import fish, ores, ocean, settings
 from .kelp import Kelp
+from .lifecycle import Lifecycle
 from .particles import Bubble
+from .pool import Pool
+from .scheduler import Scheduler, Timer
 
 
 class SpawnMode(Enum):
@@ -29,75 +32,161 @@ class Spawner[T: Sprite](Sprite):
     position: Vec2 = Vec2.ZERO  # Required placeholder
     color = colex.BLACK
     texture = ["<Unset Spawner Texture>"]
-    time_until_spawn: float = 0
-    spawned_instances: list[T]  # TODO: Remove from list when freed
+    CULL_MOVES = False
+    spawned_instances: list[T]  # Removed from when freed
+    _spawn_timer: Timer | None  # `None` when dormant
+    # State stored when made dormant, used to catch up when resumed
+    _dormant_since: int  # Frame
+    _dormant_time_until_spawn: float
+    _dormant_spawns_count: int
 
     # Make unique in `__new__`, so `__init__` can be used to init spawner
     def __new__(cls, *args: Any, **kwargs: Any) -> Self:
         instance = super().__new__(cls, *args, **kwargs)
         instance.spawned_instances = []  # Make unique
-        if not instance._INITIAL_SPAWN:
-            instance.time_until_spawn = instance._SPAWN_INTERVAL
+        # Start dormant, until a player comes near
+        instance._spawn_timer = None
+        instance._dormant_since = Scheduler.frame()
+        instance._dormant_time_until_spawn = (
+            0 if instance._INITIAL_SPAWN else instance._SPAWN_INTERVAL
+        )
+        instance._dormant_spawns_count = 0
         return instance
 
+    @property
+    def is_dormant(self) -> bool:
+        return self._spawn_timer is None
+
+    @property
+    def time_until_spawn(self) -> float:
+        if self._spawn_timer is None:
+            return self._dormant_time_until_spawn
+        return Scheduler.frames_until(self._spawn_timer)
+
+    @time_until_spawn.setter
+    def time_until_spawn(self, value: float) -> None:
+        if self._spawn_timer is None:
+            self._dormant_time_until_spawn = value
+            return
+        self._spawn_timer.cancel()
+        self._spawn_timer = Scheduler.call_in(
+            value,
+            self._on_spawn_timer,
+            owner=self,
+        )
+
     def check_active_spawns_count(self) -> int:
-        # NOTE: SIDE EFFECT: Remove from `_spawned_instances` if instance not alive
-        count = 0
-        for instance in self.spawned_instances:  # O(n) loop
-            if instance.uid in Scene.current.groups[Group.TEXTURE]:  # O(1) lookup
-                count += 1
-            else:
-                self.spawned_instances.remove(instance)
-        return count
-
-    def update(self) -> None:
-        self.time_until_spawn -= 1
+        # Freed instances are removed by `_on_spawned_freed`
+        return len(self.spawned_instances)
+
+    def _on_spawned_freed(self, instance: Node) -> None:
+        if instance in self.spawned_instances:
+            self.spawned_instances.remove(instance)  # type: ignore
+
+    def _on_spawn_timer(self) -> None:
+        # When full, wait a whole interval before checking again
         if self.check_active_spawns_count() < self._MAX_ACTIVE_SPAWNS:
-            if self.time_until_spawn <= 0:
-                self.time_until_spawn = self._SPAWN_INTERVAL
-                self.spawn()
+            self.spawn()
+        self.time_until_spawn = self._SPAWN_INTERVAL
+
+    def suspend(self) -> None:
+        """Stop spawning, and despawn spawned instances, until resumed."""
+        if self._spawn_timer is None:
+            return
+        self._dormant_time_until_spawn = self.time_until_spawn
+        self._dormant_spawns_count = self.check_active_spawns_count()
+        self._dormant_since = Scheduler.frame()
+        self._spawn_timer.cancel()
+        self._spawn_timer = None
+        for instance in self.spawned_instances:
+            Lifecycle.off_freed(instance, self._on_spawned_freed)
+            instance.queue_free()
+        self.spawned_instances.clear()
+
+    def resume(self) -> None:
+        """Start spawning again, with what would have been spawned while dormant.
+
+        Instead of replaying each frame, the number of spawn events in the gap
+        is computed, and their combined result is spawned at once.
+        """
+        if self._spawn_timer is not None:
+            return
+        gap = Scheduler.frame() - self._dormant_since
+        time_until_spawn = self._dormant_time_until_spawn
+        count = self._dormant_spawns_count
+        if gap >= time_until_spawn:
+            events = int((gap - time_until_spawn) // self._SPAWN_INTERVAL) + 1
+            count = self.count_after_spawns(count, events)
+            time_until_spawn += events * self._SPAWN_INTERVAL
+        kinds = self.get_spawn_types()
+        if self._SPAWN_MODE is SpawnMode.ALL:
+            catch_up = [kinds[index % len(kinds)] for index in range(count)]
         else:
-            self.time_until_spawn = self._SPAWN_INTERVAL
+            catch_up = [random.choice(kinds) for _ in range(count)]
+        for kind in catch_up:
+            self.spawn_instance(kind)
+        self._spawn_timer = Scheduler.call_in(
+            time_until_spawn - gap,
+            self._on_spawn_timer,
+            owner=self,
+        )
+
+    def count_after_spawns(self, count: int, events: int) -> int:
+        """Compute active spawns count after spawn events, without any despawning.
+
+        Args:
+            count (int): active spawns count before first event
+            events (int): number of spawn events
+
+        Returns:
+            int: active spawns count after last event
+        """
+        if events <= 0 or count >= self._MAX_ACTIVE_SPAWNS:
+            return count
+        match self._SPAWN_MODE:
+            case SpawnMode.RANDOM:
+                return min(count + events, self._MAX_ACTIVE_SPAWNS)
+            case SpawnMode.ALL:  # May go above max, like `spawn`
+                per_event = len(self.get_spawn_types())
+                events_until_full = -((count - self._MAX_ACTIVE_SPAWNS) // per_event)
+                return count + min(events, events_until_full) * per_event
+            case SpawnMode.ALL_UNTIL:
+                per_event = len(self.get_spawn_types())
+                return min(count + events * per_event, self._MAX_ACTIVE_SPAWNS)
+            case SpawnMode.FILL:
+                return self._MAX_ACTIVE_SPAWNS
+            case _:
+                assert_never(self._SPAWN_MODE)
+
+    def spawn_instance(self, kind: type[T]) -> T:
+        instance = Pool.acquire(kind).with_global_position(
+            self.global_position + self._SPAWN_OFFSET
+        )
+        self.init_spawned(instance)
+        self.spawned_instances.append(instance)
+        Lifecycle.on_freed(instance, self._on_spawned_freed)
+        return instance
 
     def spawn(self) -> None:
         kinds = self.get_spawn_types()
 
         match self._SPAWN_MODE:
             case SpawnMode.RANDOM:
-                kind = random.choice(kinds)
-                # instance = kind()
-                instance = kind().with_global_position(
-                    self.global_position + self._SPAWN_OFFSET
-                )
-                self.init_spawned(instance)
-                self.spawned_instances.append(instance)
+                self.spawn_instance(random.choice(kinds))
 
             case SpawnMode.ALL:
                 for kind in kinds:
-                    instance = kind().with_global_position(
-                        self.global_position + self._SPAWN_OFFSET
-                    )
-                    self.init_spawned(instance)
-                    self.spawned_instances.append(instance)
+                    self.spawn_instance(kind)
 
             case SpawnMode.ALL_UNTIL:
                 for kind in random.choices(kinds, k=len(kinds)):  # Shuffle random
-                    instance = kind().with_global_position(
-                        self.global_position + self._SPAWN_OFFSET
-                    )
-                    self.init_spawned(instance)
-                    self.spawned_instances.append(instance)
+                    self.spawn_instance(kind)
                     if len(self.spawned_instances) >= self._MAX_ACTIVE_SPAWNS:
                         break
 
             case SpawnMode.FILL:
                 while len(self.spawned_instances) < self._MAX_ACTIVE_SPAWNS:
-                    kind = random.choice(kinds)
-                    instance = kind().with_global_position(
-                        self.global_position + self._SPAWN_OFFSET
-                    )
-                    self.init_spawned(instance)
-                    self.spawned_instances.append(instance)
+                    self.spawn_instance(random.choice(kinds))
 
             case _:
                 assert_never(self._SPAWN_MODE)
@@ -170,8 +259,7 @@ class FishSpawner(
         self,
         instance: fish.SmallFish | fish.MediumFish | fish.LongFish | fish.WaterFish,
     ) -> None:
-        while ocean.Floor.has_loose_point_inside(instance.global_position):
-            instance.position += Vec2.UP
+        instance.position.y -= ocean.Floor.depth_inside(instance.global_position)
 
 
 class SwordFishSpawner(Spawner[fish.SwordFish]):
@@ -195,3 +283,31 @@ class BubbleSpawner(Spawner[Bubble]):
 
     def init_spawned(self, instance: Bubble) -> None:
         instance.z_index -= 2  # Makes it hide behind `OceanFloor`
+
+
+def update_spawner_activity(current_scene: Scene) -> None:
+    """Resume spawners near any player, and suspend spawners far from all players.
+
+    Uses a larger radius for suspending, so spawners at the edge don't flicker.
+    """
+    if Scheduler.frame() % settings.SPAWNER_ACTIVITY_CHECK_INTERVAL:
+        return
+    player_locations = [
+        player.global_position
+        for player in current_scene.get_group_members("player", type_hint=Node2D)
+    ]
+    for spawner in current_scene.get_group_members("spawner", type_hint=Spawner):
+        location = spawner.global_position
+        distance = min(
+            (location.distance_to(player) for player in player_locations),
+            default=float("inf"),
+        )
+        if spawner.is_dormant:
+            if distance <= settings.SPAWNER_ACTIVE_RADIUS:
+                spawner.resume()
+        elif distance > settings.SPAWNER_DORMANT_RADIUS:
+            spawner.suspend()
+
+
+# Run after `update_nodes` (90), before `free_queued_nodes` (80)
+Scene.frame_tasks[85] = update_spawner_activity
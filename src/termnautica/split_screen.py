@@ -1,3 +1,6 @@
+import re
+from typing import Protocol
+
 import charz_rust
 import charz
 from charz.typing import Char, FileLike, TextureNode
@@ -5,6 +8,313 @@ from charz._screen import ColorChoice
 from colex import RESET, NONE, ColorValue
 
 from . import ui
+from .frame_writer import FrameWriter, write_encoded
+from .palette import ColorDepth, Palette
+from .culling import Rect, ViewCulling
+from .lod import LOD
+
+
+type Run = tuple[str, str]  # Canonical style code, and text drawn with it
+type StyleState = tuple[frozenset[int], str | None, str | None]
+# Style left by row above and line, runs, and style left for row below
+type HalfRow = tuple[tuple[str, str], list[Run], str]
+
+
+SYNC_BEGIN: str = "\x1b[?2026h"  # Terminal holds drawing until `SYNC_END`
+SYNC_END: str = "\x1b[?2026l"
+# Rewriting this many unchanged cells is cheaper than moving the cursor past them
+_MAX_RUN_GAP: int = 6
+# Rows with this share of cells changed are written whole, without cursor moves
+_WHOLE_ROW_SHARE: float = 0.75
+# Rows of runs shorter than this on average change almost entirely when their
+# view moves, so are written whole without comparing
+_SHIFTED_RUN_LENGTH: int = 8
+# Style codes, and text up to the next different codes, since renderers
+# repeat the same codes before each char
+_RUN = re.compile(r"((?:\x1b\[[0-9;]*m)*+)((?:[^\x1b]|\1)*+)")
+_SGR_PARAMETERS = re.compile(r"\x1b\[([0-9;]*)m")
+_FLAGS_CLEARED: dict[int, tuple[int, ...]] = {
+    22: (1, 2),
+    23: (3,),
+    24: (4,),
+    25: (5, 6),
+    27: (7,),
+    28: (8,),
+    29: (9,),
+}
+# Style after codes, and the same style in color depth, by style before
+_next_styles: dict[tuple[str, str, ColorDepth], tuple[str, str]] = {}
+_transitions: dict[tuple[str, str], str] = {}
+_downsampled: dict[tuple[str, ColorDepth], str] = {}
+
+
+def sgr_state(codes: str) -> StyleState:
+    """Find style set by codes, starting from reset.
+
+    Args:
+        codes (str): ANSI SGR codes
+
+    Returns:
+        StyleState: flags, foreground and background parameters
+    """
+    parameters = ";".join(_SGR_PARAMETERS.findall(codes)).split(";")
+    flags: set[int] = set()
+    foreground: str | None = None
+    background: str | None = None
+    index = 0
+    while index < len(parameters):
+        number = int(parameters[index] or 0)
+        if number in (38, 48):  # Extended color, as `5;N` or `2;R;G;B`
+            length = 3 if parameters[index + 1 : index + 2] == ["5"] else 5
+            color = ";".join(parameters[index : index + length])
+            if number == 38:
+                foreground = color
+            else:
+                background = color
+            index += length
+            continue
+        if number == 0:
+            flags.clear()
+            foreground = background = None
+        elif 30 <= number <= 37 or 90 <= number <= 97:
+            foreground = str(number)
+        elif 40 <= number <= 47 or 100 <= number <= 107:
+            background = str(number)
+        elif number == 39:
+            foreground = None
+        elif number == 49:
+            background = None
+        elif number in _FLAGS_CLEARED:
+            flags.difference_update(_FLAGS_CLEARED[number])
+        else:
+            flags.add(number)
+        index += 1
+    return (frozenset(flags), foreground, background)
+
+
+def _sgr_parameters(state: StyleState) -> list[str]:
+    flags, foreground, background = state
+    parameters = [str(flag) for flag in sorted(flags)]
+    if foreground is not None:
+        parameters.append(foreground)
+    if background is not None:
+        parameters.append(background)
+    return parameters
+
+
+def canonical_style(codes: str) -> str:
+    """Reduce style codes to a single code with the same effect, starting from reset.
+
+    Args:
+        codes (str): ANSI SGR codes
+
+    Returns:
+        str: single SGR code, or empty string for the reset style
+    """
+    parameters = _sgr_parameters(sgr_state(codes))
+    return f"\x1b[{';'.join(parameters)}m" if parameters else ""
+
+
+def downsample_style(style: str, depth: ColorDepth) -> str:
+    """Convert colors of canonical style to color depth, through lookup tables.
+
+    Args:
+        style (str): canonical style
+        depth (ColorDepth): colors to convert to
+
+    Returns:
+        str: canonical style, using only colors of color depth
+    """
+    key = (style, depth)
+    downsampled = _downsampled.get(key)
+    if downsampled is None:
+        flags, foreground, background = sgr_state(style)
+        parameters = _sgr_parameters(
+            (
+                flags,
+                None if foreground is None else Palette.color(foreground, depth),
+                None if background is None else Palette.color(background, depth),
+            )
+        )
+        downsampled = _downsampled[key] = (
+            f"\x1b[{';'.join(parameters)}m" if parameters else ""
+        )
+    return downsampled
+
+
+def style_transition(style: str, next_style: str) -> str:
+    """Get shortest code that changes terminal from one canonical style to another.
+
+    Args:
+        style (str): canonical style the terminal is in
+        next_style (str): canonical style to change to
+
+    Returns:
+        str: single SGR code, either adding to current style or starting from reset
+    """
+    key = (style, next_style)
+    transition = _transitions.get(key)
+    if transition is not None:
+        return transition
+    flags, foreground, background = sgr_state(style)
+    next_state = sgr_state(next_style)
+    next_flags, next_foreground, next_background = next_state
+    parameters = ["0", *_sgr_parameters(next_state)]
+    # Flags can only be removed by reset, since some share their off code
+    if flags <= next_flags:
+        added = [str(flag) for flag in sorted(next_flags - flags)]
+        if next_foreground != foreground:
+            added.append(next_foreground or "39")
+        if next_background != background:
+            added.append(next_background or "49")
+        if len(";".join(added)) < len(";".join(parameters)):
+            parameters = added
+    transition = _transitions[key] = f"\x1b[{';'.join(parameters)}m"
+    return transition
+
+
+def parse_runs(
+    line: str,
+    style: str = "",
+    depth: ColorDepth = ColorDepth.TRUECOLOR,
+) -> tuple[list[Run], str]:
+    """Split rendered line into runs of text drawn with the same style.
+
+    Args:
+        line (str): line with ANSI style codes
+        style (str, optional): style left by previous line. Defaults to reset.
+        depth (ColorDepth, optional): colors of run styles. Defaults to truecolor.
+
+    Returns:
+        tuple[list[Run], str]: canonical style code and text of each run,
+            and style left for next line, before converting colors
+    """
+    runs: list[Run] = []
+    shown_style = downsample_style(style, depth)
+    for codes, text in _RUN.findall(line):
+        if codes:
+            key = (style, codes, depth)
+            next_styles = _next_styles.get(key)
+            if next_styles is None:
+                next_style = canonical_style(style + codes)
+                next_styles = _next_styles[key] = (
+                    next_style,
+                    downsample_style(next_style, depth),
+                )
+            style, shown_style = next_styles
+            # Same codes again have no further effect
+            text = text.replace(codes, "")
+        if not text:
+            continue
+        if runs and runs[-1][0] == shown_style:  # Only differed before converting
+            runs[-1] = (shown_style, runs[-1][1] + text)
+        else:
+            runs.append((shown_style, text))
+    return (runs, style)
+
+
+def _parse_half_row(
+    half_rows: list[HalfRow],
+    row: int,
+    line: str,
+    style: str,
+    depth: ColorDepth,
+) -> tuple[list[Run], str, bool]:
+    # Parse line of one half into runs, unless it is the same as last frame,
+    # returning runs, style left for next line, and whether it changed
+    key = (style, line)
+    if row < len(half_rows):
+        half_row = half_rows[row]
+        if half_row[0] == key:
+            return (half_row[1], half_row[2], False)
+    runs, style_after = parse_runs(line, style, depth)
+    if row < len(half_rows):
+        half_rows[row] = (key, runs, style_after)
+    else:
+        half_rows.append((key, runs, style_after))
+    return (runs, style_after, True)
+
+
+def _changed_spans(
+    runs: list[Run],
+    shown_runs: list[Run],
+) -> tuple[list[list[int]], int] | None:
+    # Find columns where runs differ from shown runs, comparing the parts where
+    # runs of both overlap, and merging short gaps, returning spans and width,
+    # or `None` if widths differ
+    spans: list[list[int]] = []
+    count = len(runs)
+    shown_count = len(shown_runs)
+    index = shown_index = 0
+    offset = shown_offset = 0  # Into text of current runs
+    column = 0
+    while index < count:
+        if shown_index == shown_count:
+            return None
+        run = runs[index]
+        shown_run = shown_runs[shown_index]
+        if not offset and not shown_offset and run == shown_run:
+            column += len(run[1])
+            index += 1
+            shown_index += 1
+            continue
+        style, text = run
+        shown_style, shown_text = shown_run
+        rest = len(text) - offset
+        shown_rest = len(shown_text) - shown_offset
+        length = rest if rest < shown_rest else shown_rest
+        start = 0
+        stop = length
+        if style == shown_style:
+            part = text[offset : offset + length]
+            shown_part = shown_text[shown_offset : shown_offset + length]
+            if part == shown_part:
+                stop = 0
+            else:  # Skip same chars at both ends
+                while part[start] == shown_part[start]:
+                    start += 1
+                while part[stop - 1] == shown_part[stop - 1]:
+                    stop -= 1
+        if start < stop:
+            if spans and column + start - spans[-1][1] <= _MAX_RUN_GAP:
+                spans[-1][1] = column + stop
+            else:
+                spans.append([column + start, column + stop])
+        column += length
+        if length == rest:
+            index += 1
+            offset = 0
+        else:
+            offset += length
+        if length == shown_rest:
+            shown_index += 1
+            shown_offset = 0
+        else:
+            shown_offset += length
+    if shown_index != shown_count:
+        return None
+    return (spans, column)
+
+
+def _encode_row(runs: list[Run], style: str, style_after: str) -> str:
+    # Write row starting in style, with codes only where style changes,
+    # and leave style left for row below
+    encoded: list[str] = []
+    for run_style, text in runs:
+        if run_style != style:
+            encoded.append(style_transition(style, run_style))
+            style = run_style
+        encoded.append(text)
+    # Trailing codes of line
+    if style_after != style:
+        encoded.append(style_transition(style, style_after))
+    return "".join(encoded)
+
+
+class ViewClipped(Protocol):
+    """Node in group `"clip-to-view"`, that rebuilds its texture for each view."""
+
+    def clip_to_view(self, start: charz.Vec2, size: charz.Vec2i) -> None: ...
 
 
 class FastSplitScreen(charz.Screen):
@@ -25,6 +335,9 @@ class FastSplitScreen(charz.Screen):
         delimiter: str = "|",
         delimiter_color: ColorValue | None = None,
         delimiter_offset: int = 0,
+        diff_output: bool = False,
+        color_depth: ColorDepth = ColorDepth.TRUECOLOR,
+        threaded_output: bool = False,
     ) -> None:
         super().__init__(
             width,
@@ -46,9 +359,48 @@ class FastSplitScreen(charz.Screen):
         self.delimiter_offset = delimiter_offset
         self._screen_1 = charz_rust.RustScreen()
         self._screen_2 = charz_rust.RustScreen()
-        self._composed_buffer = list[str]()
+        self._inner_layout: tuple[int, int, int, int] | None = None
+        self.color_depth = color_depth
+        # Runs of delimiter, and style left for the right half, by delimiter
+        # and color depth it was parsed for
+        self._delimiter_key: tuple[str, ColorValue | None, ColorDepth] | None = None
+        self._delimiter_runs = list[Run]()
+        self._delimiter_style = ""
+        # Parsed lines of each half, and rows of frame joined from them,
+        # which are the same list until either half changes
+        self._half_rows = (list[HalfRow](), list[HalfRow]())
+        self._frame = list[list[Run]]()
+        self._frame_styles_after = list[str]()  # Style left for row below
+        # Only write changed cells, relative to the last frame written
+        self.diff_output = diff_output
+        self._shown_layout: tuple[int, int, ColorDepth] | None = None
+        # Rows of frame as shown, and each row as encoded by the last full frame,
+        # with the style it was encoded to start in
+        self._shown_rows = list[list[Run]]()
+        self._shown_encoded = list[tuple[str, str] | None]()
+        # Shown rows replaced by last diff frame, `None` after a full frame
+        self._replaced_rows: list[tuple[int, list[Run]]] | None = None
+        # Global view of each half when last rendered, since every line
+        # of a half is shifted when its view moves
+        self._views: list[Rect | None] = [None, None]
+        self._views_moved = [True, True]
+        # Write from a background thread, started with the screen
+        self.threaded_output = threaded_output
+        self.writer: FrameWriter | None = None
+        self.frame_bytes: int = 0  # Written for last frame
+        self.total_bytes: int = 0
 
     def _resize_inner_screens(self) -> None:
+        # Only resize when size or delimiter changed
+        inner_layout = (
+            self.width,
+            self.height,
+            len(self.delimiter),
+            self.delimiter_offset,
+        )
+        if inner_layout == self._inner_layout:
+            return
+        self._inner_layout = inner_layout
         self._screen_1.height = self.height
         self._screen_2.height = self.height
 
@@ -70,20 +422,39 @@ class FastSplitScreen(charz.Screen):
         self._screen_1.reset_buffer()
         self._screen_2.reset_buffer()
 
+    def _cull_to_view(
+        self,
+        screen: charz_rust.RustScreen,
+        half: int,
+    ) -> list[TextureNode]:
+        # Same viewport calculation as `RustScreen.render_all`
+        camera = charz.Camera.current
+        start = camera.global_position
+        size = screen.get_actual_size()
+        if camera.mode & charz.Camera.MODE_CENTERED:
+            start -= size // 2
+        if camera.mode & charz.Camera.MODE_INCLUDE_SIZE and isinstance(
+            camera.parent, charz.TextureComponent
+        ):
+            start += camera.parent.get_texture_size() / 2
+        view = (start.x, start.y, start.x + size.x, start.y + size.y)
+        self._views_moved[half] = view != self._views[half]
+        self._views[half] = view
+        for node in charz.Scene.current.get_group_members(
+            "clip-to-view", type_hint=ViewClipped
+        ):
+            node.clip_to_view(start, size)
+        return ViewCulling.cull(start, size)
+
     def refresh(self) -> None:
         self._resize_if_necessary()
         self._resize_inner_screens()
-        self.reset_buffer()
-        texture_nodes = charz.Scene.current.get_group_members(
-            charz.Group.TEXTURE,
-            type_hint=TextureNode,
-        )
         hud_2 = charz.Scene.current.get_first_group_member(
             "hud-2", type_hint=ui.HUDElement
         )
         hud_2_was_visible = hud_2.visible
         hud_2.hide()
-        self._screen_1.render_all(texture_nodes)
+        self._screen_1.render_all(self._cull_to_view(self._screen_1, 0))
         if hud_2_was_visible:
             hud_2.show()
         just_current_camera = charz.Camera.current
@@ -93,31 +464,230 @@ class FastSplitScreen(charz.Screen):
         )
         hud_1_was_visible = hud_1.visible
         hud_1.hide()
-        self._screen_2.render_all(texture_nodes)
+        self._screen_2.render_all(self._cull_to_view(self._screen_2, 1))
         if hud_1_was_visible:
             hud_1.show()
         charz.Camera.current = just_current_camera
+        # Level of detail is picked by the views as rendered
+        LOD.set_views([view for view in self._views if view is not None])
+        self._composite()
+        self.show()
 
-        buf_1 = self._screen_1._single_line_buffer.split("\n")
-        buf_2 = self._screen_2._single_line_buffer.split("\n")
-
-        self._composed_buffer.clear()
-        final_delimiter_color = (
-            self.delimiter_color if self.delimiter_color is not None else NONE
-        )
-        for line_1, line_2 in zip(buf_1, buf_2):
-            self._composed_buffer.append(
-                line_1 + RESET + final_delimiter_color + self.delimiter + line_2
+    def _composite(self) -> None:
+        # Join runs of both halves and the delimiter into rows of frame,
+        # parsing only lines that changed, and joining only rows that changed
+        depth = self.color_depth
+        delimiter_key = (self.delimiter, self.delimiter_color, depth)
+        if delimiter_key != self._delimiter_key:
+            self._delimiter_key = delimiter_key
+            final_delimiter_color = (
+                self.delimiter_color if self.delimiter_color is not None else NONE
             )
-        self.show()
+            self._delimiter_runs, self._delimiter_style = parse_runs(
+                RESET + final_delimiter_color + self.delimiter, "", depth
+            )
+            # Parsed in another color depth, or joined with another delimiter
+            for half_rows in self._half_rows:
+                half_rows.clear()
+            self._frame.clear()
+        lines_1 = self._screen_1._single_line_buffer.split("\n")
+        lines_2 = self._screen_2._single_line_buffer.split("\n")
+        rows = min(len(lines_1), len(lines_2))
+        half_rows_1, half_rows_2 = self._half_rows
+        frame = self._frame
+        frame_styles_after = self._frame_styles_after
+        del half_rows_1[rows:]
+        del half_rows_2[rows:]
+        del frame[rows:]
+        del frame_styles_after[rows:]
+        style = ""  # Style is kept from one line to the next
+        for row in range(rows):
+            runs_1, style, is_changed_1 = _parse_half_row(
+                half_rows_1, row, lines_1[row], style, depth
+            )
+            runs_2, style, is_changed_2 = _parse_half_row(
+                half_rows_2, row, lines_2[row], self._delimiter_style, depth
+            )
+            if row == len(frame):
+                frame.append(runs_1 + self._delimiter_runs + runs_2)
+                frame_styles_after.append(style)
+            elif is_changed_1 or is_changed_2:
+                frame[row] = runs_1 + self._delimiter_runs + runs_2
+                frame_styles_after[row] = style
+
+    def on_startup(self) -> None:
+        super().on_startup()
+        if self.threaded_output:
+            self.writer = FrameWriter(self.stream)
+
+    def on_cleanup(self) -> None:
+        # Finish writing frames before restoring the terminal
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        super().on_cleanup()
 
     def show(self) -> None:
         # NOTE: Does not use actual size until fix in `charz-rust`
-        # Construct frame from screen buffer
-        out = "\n".join(self._composed_buffer)
+        if self.writer is not None and (dropped_bytes := self.writer.take_pending()):
+            # Counted when handed off, but never written
+            self.total_bytes -= dropped_bytes
+            if self.diff_output:
+                self._restore_replaced_rows()
+        if self.diff_output:
+            out = self._compose_diff()
+        else:
+            out = self._compose_full()
+        # Encoded once, and written to the binary buffer of the stream if it has one
+        data = out.encode(getattr(self.stream, "encoding", None) or "utf-8")
+        self.frame_bytes = len(data)
+        self.total_bytes += self.frame_bytes
+        if not data:  # Same as last frame
+            return
+        if self.writer is not None:
+            self.writer.submit(data)
+            return
+        write_encoded(self.stream, data)
+
+    def _restore_replaced_rows(self) -> None:
+        # Last frame was never written, so diff against the frame before it
+        if self._replaced_rows is None:
+            self._shown_layout = None  # Was a full frame, so write another
+            return
+        for row, runs in self._replaced_rows:
+            self._shown_rows[row] = runs
+            self._shown_encoded[row] = None
+
+    def _compose_full(self) -> str:
+        # Construct frame from runs, writing style codes only where
+        # style changes, which is kept across the delimiter and line ends
+        self._check_layout()
+        self._replaced_rows = None
+        depth = self.color_depth
+        parts: list[str] = []
+        current_style = ""  # As written, after converting colors
+        shown_rows = self._shown_rows
+        shown_encoded = self._shown_encoded
+        for row, runs in enumerate(self._frame):
+            style_after = downsample_style(self._frame_styles_after[row], depth)
+            if row < len(shown_rows):
+                encoded_row = shown_encoded[row]
+                if (
+                    shown_rows[row] is runs
+                    and encoded_row is not None
+                    and encoded_row[0] == current_style
+                ):
+                    # Same row, starting in same style, is encoded the same way
+                    parts.append(encoded_row[1])
+                    current_style = style_after
+                    continue
+            parts.append(_encode_row(runs, current_style, style_after))
+            if row < len(shown_rows):
+                shown_rows[row] = runs
+                shown_encoded[row] = (current_style, parts[-1])
+            else:
+                shown_rows.append(runs)
+                shown_encoded.append((current_style, parts[-1]))
+            current_style = style_after
+        rows = len(self._frame)
+        del shown_rows[rows:]
+        del shown_encoded[rows:]
+        out = "\n".join(parts)
         out += RESET
         cursor_move_code = f"\x1b[{self.height - 1}A" + "\r"
         out += cursor_move_code
-        # Write and flush
-        self.stream.write(out)
-        self.stream.flush()
+        return out
+
+    def _check_layout(self) -> bool:
+        # Forget shown rows if written in another size or color depth
+        layout = (self.width, self.height, self.color_depth)
+        if layout == self._shown_layout:
+            return True
+        self._shown_layout = layout
+        self._shown_rows.clear()
+        self._shown_encoded.clear()
+        return False
+
+    def _compose_diff(self) -> str:
+        frame = self._frame
+        if not self._check_layout() or len(frame) != len(self._shown_rows):
+            return SYNC_BEGIN + self._compose_full() + SYNC_END
+        replaced_rows = self._replaced_rows = []
+        depth = self.color_depth
+        is_shifted = all(self._views_moved)  # Lines of both halves are shifted
+        # Cursor rests at top left between frames, and style is reset
+        parts: list[str] = []
+        cursor_row = 0
+        cursor_column = 0
+        current_style = ""
+        for row, runs in enumerate(frame):
+            shown_runs = self._shown_rows[row]
+            if runs is shown_runs:  # Neither half changed
+                continue
+            is_whole = is_shifted and len(runs) * _SHIFTED_RUN_LENGTH > self.width
+            spans: list[list[int]] = []
+            if not is_whole:
+                changed = _changed_spans(runs, shown_runs)
+                if changed is None:  # Nothing written yet, so start over
+                    self._shown_layout = None
+                    return self._compose_diff()
+                spans, width = changed
+                is_whole = bool(spans) and (
+                    sum(stop - start for start, stop in spans)
+                    >= width * _WHOLE_ROW_SHARE
+                )
+            replaced_rows.append((row, shown_runs))
+            self._shown_rows[row] = runs
+            if not is_whole and not spans:
+                continue
+            if row != cursor_row:
+                parts.append(f"\x1b[{row - cursor_row}B")
+            cursor_row = row
+            if is_whole:
+                # Write whole row the same way as full frames, and keep it for them
+                if cursor_column != 0:
+                    parts.append("\r")
+                style_after = downsample_style(self._frame_styles_after[row], depth)
+                encoded_row = _encode_row(runs, current_style, style_after)
+                self._shown_encoded[row] = (current_style, encoded_row)
+                parts.append(encoded_row)
+                parts.append("\r")
+                cursor_column = 0
+                current_style = style_after
+                continue
+            self._shown_encoded[row] = None  # Only encoded by full frames
+            index = 0
+            run_start = 0  # Column of run at index
+            for start, stop in spans:
+                # Move cursor relative to where it is
+                if start == 0 and cursor_column != 0:
+                    parts.append("\r")
+                elif start > cursor_column:
+                    parts.append(f"\x1b[{start - cursor_column}C")
+                elif start < cursor_column:
+                    parts.append(f"\x1b[{cursor_column - start}D")
+                column = start
+                while column < stop:
+                    style, text = runs[index]
+                    run_stop = run_start + len(text)
+                    if run_stop <= column:
+                        index += 1
+                        run_start = run_stop
+                        continue
+                    if style != current_style:
+                        parts.append(style_transition(current_style, style))
+                        current_style = style
+                    parts.append(text[column - run_start : stop - run_start])
+                    column = min(stop, run_stop)
+                cursor_column = stop
+                if stop == width:
+                    # Cursor may wait to wrap at the last column, so return
+                    parts.append("\r")
+                    cursor_column = 0
+        if not parts:
+            return ""
+        parts.append(RESET)
+        if cursor_row:
+            parts.append(f"\x1b[{cursor_row}A")
+        parts.append("\r")
+        return SYNC_BEGIN + "".join(parts) + SYNC_END
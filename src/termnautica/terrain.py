@@ -0,0 +1,106 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+
+type Coordinate = tuple[int, int]
+type Interval = tuple[int, int]  # Inclusive Y-range
+
+
+_low = itemgetter(0)
+_high = itemgetter(1)
+
+
+class TerrainIndex:
+    """Column based index over solid terrain tiles.
+
+    Each column stores its surface height (smallest Y-position, since Y grows downward)
+    and a sorted list of merged intervals, which covers both the floor tile
+    and any abyss wall tiles placed in that column.
+    """
+
+    def __init__(self) -> None:
+        self._surface: dict[int, int] = {}
+        self._columns: dict[int, list[Interval]] = {}
+
+    def __len__(self) -> int:
+        return len(self._surface)
+
+    def clear(self) -> None:
+        self._surface.clear()
+        self._columns.clear()
+
+    def add_point(self, point: Coordinate) -> None:
+        x, y = point
+        surface = self._surface.get(x)
+        if surface is None or y < surface:
+            self._surface[x] = y
+        intervals = self._columns.setdefault(x, [])
+        # Merge with intervals that overlap or touch `y`
+        start = bisect_left(intervals, y - 1, key=_high)
+        end = bisect_right(intervals, y + 1, key=_low)
+        if start < end:
+            y_start = min(y, intervals[start][0])
+            y_end = max(y, intervals[end - 1][1])
+            intervals[start:end] = [(y_start, y_end)]
+        else:
+            intervals.insert(start, (y, y))
+
+    def remove_columns(self, start: int, stop: int) -> None:
+        """Remove all tiles in columns.
+
+        Args:
+            start (int): first column X-position, inclusive
+            stop (int): last column X-position, exclusive
+        """
+        for x in range(start, stop):
+            self._surface.pop(x, None)
+            self._columns.pop(x, None)
+
+    def surface_height_at(self, x: int) -> int | None:
+        """Get height of the highest tile in column.
+
+        Args:
+            x (int): column X-position
+
+        Returns:
+            int | None: Y-position of highest tile, or `None` if column is empty
+        """
+        return self._surface.get(x)
+
+    def has_point(self, point: Coordinate) -> bool:
+        x, y = point
+        intervals = self._columns.get(x)
+        if not intervals:
+            return False
+        index = bisect_right(intervals, y, key=_low) - 1
+        return index >= 0 and intervals[index][1] >= y
+
+    def has_point_inside(self, point: Coordinate) -> bool:
+        # With "Inside", I mean under any tile in Y-axis (including tile location itself)
+        surface = self._surface.get(point[0])
+        return surface is not None and surface <= point[1]
+
+    def overlaps_rect(self, start: Coordinate, end: Coordinate) -> bool:
+        """Check if any tile is inside rectangle.
+
+        Args:
+            start (Coordinate): top left corner, inclusive
+            end (Coordinate): bottom right corner, exclusive
+
+        Returns:
+            bool: whether any tile overlaps the rectangle
+        """
+        top = start[1]
+        bottom = end[1] - 1
+        if bottom < top:
+            return False
+        for x in range(start[0], end[0]):
+            surface = self._surface.get(x)
+            if surface is None or surface > bottom:
+                continue
+            intervals = self._columns[x]
+            # Last interval starting above `bottom` reaches furthest down
+            index = bisect_right(intervals, bottom, key=_low) - 1
+            if intervals[index][1] >= top:
+                return True
+        return False
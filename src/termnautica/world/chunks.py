@@ -0,0 +1,173 @@
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from math import floor
+
+from charz import Scene, Group, Node, Node2D
+from charz_core.typing import NodeID
+
+from .. import ocean, settings, spawners
+from ..lifecycle import Lifecycle
+from .schemas import Seed
+
+
+type ChunkIndex = int
+
+
+_BOUNDARY_DEPTH_RANGE: float = 10  # Max depth offset at chunk boundaries
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ChunkData:
+    index: ChunkIndex
+    floor: ocean.FloorData
+    strips: list[ocean.FloorStrip]  # Baked floor tiles
+    water: list[int]  # Rest offsets of ocean surface
+
+
+def chunk_start_x(index: ChunkIndex) -> int:
+    return index * settings.CHUNK_WIDTH
+
+
+def chunk_index_at(x: float) -> ChunkIndex:
+    return floor(x) // settings.CHUNK_WIDTH
+
+
+def boundary_depth(seed: Seed, index: ChunkIndex) -> float:
+    """Get floor depth at the left edge of chunk.
+
+    Only depends on `seed` and `index`,
+    so the chunks on both sides agree, no matter which is generated first.
+
+    Args:
+        seed (Seed): world seed
+        index (ChunkIndex): chunk index
+
+    Returns:
+        float: floor depth, relative to `Floor.REST_DEPTH`
+    """
+    if index == 0:  # Start flat, like before
+        return 0
+    rng = random.Random(f"{seed}:boundary:{index}")
+    return rng.uniform(-_BOUNDARY_DEPTH_RANGE, _BOUNDARY_DEPTH_RANGE)
+
+
+def generate_chunk(seed: Seed, index: ChunkIndex) -> ChunkData:
+    """Generate data for chunk, without creating any nodes. Safe to run in a thread.
+
+    Args:
+        seed (Seed): world seed
+        index (ChunkIndex): chunk index
+
+    Returns:
+        ChunkData: generated chunk data
+    """
+    rng = random.Random(f"{seed}:{index}")
+    floor_data = ocean.generate_floor(
+        rng,
+        start_x=chunk_start_x(index),
+        width=settings.CHUNK_WIDTH,
+        start_depth=boundary_depth(seed, index),
+        end_depth=boundary_depth(seed, index + 1),
+    )
+    water = ocean.generate_water(rng, settings.CHUNK_WIDTH)
+    return ChunkData(
+        index=index,
+        floor=floor_data,
+        strips=ocean.bake_floor(floor_data.tiles),
+        water=water,
+    )
+
+
+class ChunkStreamer(Node):
+    """Loads chunks around players, and frees chunks far away from all players.
+
+    Chunk data is generated in a worker thread ahead of time,
+    in the direction players are moving. Nodes are only created on the main thread.
+    """
+
+    def __init__(self, seed: Seed, ocean_surface: ocean.OceanSurface) -> None:
+        self._seed = seed
+        self._ocean_surface = ocean_surface
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: dict[ChunkIndex, Future[ChunkData]] = {}
+        self._loaded: dict[ChunkIndex, list[Node2D]] = {}
+        self._last_player_x: dict[NodeID, float] = {}
+        Lifecycle.on_freed(self, self._on_freed)
+        self.stream()
+
+    def _on_freed(self, _node: Node) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def loaded_chunks(self) -> list[ChunkIndex]:
+        return sorted(self._loaded)
+
+    def update(self) -> None:
+        self.stream()
+
+    def stream(self) -> None:
+        players = list(Scene.current.get_group_members("player", type_hint=Node2D))
+        if not players:  # Keep chunks loaded, until a player is back
+            return
+        player_indices: list[ChunkIndex] = []
+        for player in players:
+            x = player.global_position.x
+            center = chunk_index_at(x)
+            player_indices.append(center)
+            for index in range(
+                center - settings.CHUNK_LOAD_DISTANCE,
+                center + settings.CHUNK_LOAD_DISTANCE + 1,
+            ):
+                if index not in self._loaded:
+                    self.load_chunk(index)
+            # Prefetch next chunk in the direction player is moving
+            last_x = self._last_player_x.get(player.uid, x)
+            self._last_player_x[player.uid] = x
+            if x != last_x:
+                direction = 1 if x > last_x else -1
+                self.prefetch_chunk(
+                    center + direction * (settings.CHUNK_LOAD_DISTANCE + 1)
+                )
+        for index in list(self._loaded):
+            if all(
+                abs(index - center) > settings.CHUNK_EVICT_DISTANCE
+                for center in player_indices
+            ):
+                self.evict_chunk(index)
+
+    def prefetch_chunk(self, index: ChunkIndex) -> None:
+        if index in self._loaded or index in self._pending:
+            return
+        self._pending[index] = self._executor.submit(
+            generate_chunk, self._seed, index
+        )
+
+    def load_chunk(self, index: ChunkIndex) -> None:
+        future = self._pending.pop(index, None)
+        if future is not None:
+            data = future.result()  # Usually already done
+        else:
+            data = generate_chunk(self._seed, index)
+        nodes: list[Node2D] = ocean.build_floor(data.floor, data.strips)
+        self._ocean_surface.add_columns(chunk_start_x(index), data.water)
+        ocean.Water.add_chunk(index)
+        self._loaded[index] = nodes
+
+    def evict_chunk(self, index: ChunkIndex) -> None:
+        # Walk down from nodes of chunk, to what their spawners spawned.
+        # Nodes keep no list of children, so nodes that create children
+        # free them when freed themselves, like `Kelp`
+        to_visit: list[Node] = list(self._loaded.pop(index))
+        nodes = Scene.current.groups[Group.NODE]
+        while to_visit:
+            node = to_visit.pop()
+            if isinstance(node, spawners.Spawner):
+                to_visit.extend(node.spawned_instances)
+            if node.uid in nodes:
+                node.queue_free()
+        start_x = chunk_start_x(index)
+        stop_x = start_x + settings.CHUNK_WIDTH
+        ocean.Floor.remove_columns(start_x, stop_x)
+        self._ocean_surface.remove_columns(start_x, stop_x)
+        ocean.Water.remove_chunk(index)
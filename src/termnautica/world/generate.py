@@ -3,6 +3,7 @@ import tomllib
 from typing import BinaryIO
 
 from .. import ocean
+from .chunks import ChunkStreamer
 from .schemas import Seed, SaveData
 
 
@@ -10,9 +11,11 @@ SEED_MIN: Seed = 1
 SEED_MAX: Seed = 1000
 
 
-def generate_static() -> None:
-    ocean.generate_floor()
-    ocean.generate_water()
+def generate_static(seed: Seed) -> ocean.OceanSurface:
+    ocean_surface = ocean.OceanSurface()
+    # Floor and water are streamed in chunks around players
+    ChunkStreamer(seed, ocean_surface)
+    return ocean_surface
 
 
 def generate_world(*, save_file: BinaryIO | None = None) -> SaveData:
@@ -37,10 +40,8 @@ def generate_world(*, save_file: BinaryIO | None = None) -> SaveData:
             # spawners=[],
             # tiles=[],
         )
-    generate_static()
+    ocean_surface = generate_static(data["seed"])
     # Attatch lifepod to waving water
-    # TODO: Update `Lifepod` position internally using ocean formula
     lifepod = Lifepod()
-    middle_ocean_water = ocean.Water().save_rest_location()
-    lifepod.parent = middle_ocean_water
+    ocean_surface.attach(lifepod)
     return data
@@ -44,3 +44,4 @@ def apply_save_data(data: SaveData) -> None:
     # ):
 
     ocean.Water.wave_time_remaining = data["wave_time"]
+    ocean.Water.update_height_tables()